@@ -0,0 +1,361 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# low-cardinality filter dimensions of the dashboard
+DIMENSIONS = ["Churn", "InternetService", "Contract", "PaymentMethod"]
+MEASURES = ["tenure", "MonthlyCharges", "TotalCharges"]
+
+
+class Cube:
+    """Counts, sums and sums of squares per combination of ``DIMENSIONS``.
+
+    Built once per dataset version; every KPI, average and categorical bar
+    chart of the dashboard is answered from at most a few dozen cells, so
+    their cost does not depend on the number of customers. The dashboard
+    builds a new cube for every dataset version.
+    """
+
+    def __init__(self, data: Optional[pd.DataFrame] = None):
+        self.cells = pd.DataFrame(
+            columns=DIMENSIONS
+            + ["count"]
+            + MEASURES
+            + [f"{measure}_sq" for measure in MEASURES]
+        )
+        if data is not None:
+            self.append(data)
+
+    @staticmethod
+    def _aggregate(data: pd.DataFrame) -> pd.DataFrame:
+        values = data[MEASURES].astype("float64")
+        grouped = pd.concat(
+            [
+                values,
+                (values**2).add_suffix("_sq"),
+                data[DIMENSIONS].astype(object),
+            ],
+            axis=1,
+        ).groupby(DIMENSIONS, observed=True, sort=True)
+
+        cells = grouped.sum()
+        cells.insert(0, "count", grouped.size())
+        return cells.reset_index()
+
+    def append(self, data: pd.DataFrame) -> "Cube":
+        """Add the counts and sums of newly appended rows to the cells.
+
+        Only for customers not yet in the cube: a changed customer's earlier
+        values are not subtracted.
+        """
+        cells = self._aggregate(data)
+        if len(self.cells):
+            cells = (
+                pd.concat([self.cells, cells], ignore_index=True)
+                .groupby(DIMENSIONS, sort=True, as_index=False)
+                .sum()
+            )
+        self.cells = cells
+        return self
+
+    def kpis(self, filters: Optional[Dict[str, List[str]]] = None) -> Dict[str, float]:
+        """Overall and filtered KPIs as plain numbers, from one grouped reduction."""
+        cells = self.cells
+        selected = self._selection(filters)
+        churned = (cells["Churn"] == "Yes").to_numpy()
+        sums = cells[["count"] + MEASURES].groupby([selected, churned]).sum()
+        sums = sums.reindex(
+            pd.MultiIndex.from_product([[False, True], [False, True]]), fill_value=0
+        )
+
+        overall = sums.sum()
+        overall_churned = sums.xs(True, level=1).sum()
+        filtered = sums.loc[True].sum()
+        filtered_churned = sums.loc[(True, True)]
+
+        def ratio(numerator: float, denominator: float) -> float:
+            return float(numerator / denominator) if denominator else float("nan")
+
+        return {
+            "total_customers": int(overall["count"]),
+            "active_customers": int(overall["count"] - overall_churned["count"]),
+            "churned_customers": int(overall_churned["count"]),
+            "churn_rate": ratio(overall_churned["count"], overall["count"]),
+            "total_charges": float(overall["TotalCharges"]),
+            "filtered_customers": int(filtered["count"]),
+            "filtered_churned_customers": int(filtered_churned["count"]),
+            "filtered_churn_rate": ratio(filtered_churned["count"], filtered["count"]),
+            **{
+                f"filtered_avg_{measure}": ratio(filtered[measure], filtered["count"])
+                for measure in MEASURES
+            },
+        }
+
+    def _selection(self, filters: Optional[Dict[str, List[str]]]) -> np.ndarray:
+        mask = np.ones(len(self.cells), dtype=bool)
+        for dimension, values in (filters or {}).items():
+            if values:
+                mask &= self.cells[dimension].isin(values).to_numpy()
+        return mask
+
+    def select(self, filters: Optional[Dict[str, List[str]]] = None) -> pd.DataFrame:
+        """Cells matching ``filters``; an empty selection leaves a dimension open."""
+        return self.cells[self._selection(filters)]
+
+    @staticmethod
+    def counts_by(cells: pd.DataFrame, dimension: str) -> pd.DataFrame:
+        """Customer counts per ``dimension`` value split by Churn, for bar charts."""
+        group = [dimension] if dimension == "Churn" else [dimension, "Churn"]
+        return cells.groupby(group, sort=True)["count"].sum().reset_index()
+
+    @staticmethod
+    def describe(cells: pd.DataFrame, dimensions: List[str]) -> pd.DataFrame:
+        """Equivalent of ``DataFrame.describe()`` for categorical dimensions."""
+        summary = {}
+        for dimension in dimensions:
+            counts = cells.groupby(dimension)["count"].sum()
+            counts = counts[counts > 0]
+            summary[dimension] = {
+                "count": int(counts.sum()),
+                "unique": len(counts),
+                "top": counts.idxmax() if len(counts) else None,
+                "freq": int(counts.max()) if len(counts) else 0,
+            }
+        return pd.DataFrame(summary, dtype=object)
+
+
+class FilterIndex:
+    """Per-value boolean masks over the dataset for the dashboard filters.
+
+    Built once per dataset version. A selection is resolved with bitwise OR
+    within a dimension and AND across dimensions into one row-index array,
+    so filtering never materializes intermediate frames.
+    """
+
+    def __init__(self, data: pd.DataFrame, dimensions: List[str] = DIMENSIONS):
+        self.size = len(data)
+        self.masks = {}
+        for dimension in dimensions:
+            codes, uniques = pd.factorize(data[dimension], sort=True)
+            self.masks[dimension] = {
+                value: codes == code for code, value in enumerate(uniques)
+            }
+
+    def mask(
+        self, filters: Optional[Dict[str, List[str]]] = None
+    ) -> Optional[np.ndarray]:
+        """Boolean mask of rows matching ``filters``, or None if nothing is excluded."""
+        selected = None
+        for dimension, values in (filters or {}).items():
+            masks = self.masks[dimension]
+            if not values or set(masks) <= set(values):
+                continue  # nothing excluded on this dimension
+            matched = np.zeros(self.size, dtype=bool)
+            for value in values:
+                if value in masks:
+                    matched |= masks[value]
+            selected = matched if selected is None else selected & matched
+        return selected
+
+    def resolve(self, filters: Optional[Dict[str, List[str]]] = None) -> np.ndarray:
+        """Row positions matching ``filters``; empty selections do not filter."""
+        selected = self.mask(filters)
+        if selected is None:
+            return np.arange(self.size)
+        return np.flatnonzero(selected)
+
+
+class TopIndex:
+    """Row positions presorted by each measure, largest first.
+
+    Built once per dataset version. A filtered top-N walks the sorted order
+    and stops as soon as N rows pass the mask, instead of scanning the whole
+    selection; ties keep dataset order, as with ``nlargest``.
+    """
+
+    def __init__(self, data: pd.DataFrame, measures: List[str] = MEASURES):
+        self.order = {
+            measure: np.argsort(-data[measure].to_numpy(), kind="stable")
+            for measure in measures
+        }
+
+    def top(
+        self, measure: str, n: int, mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Positions of the ``n`` largest rows of ``measure`` among ``mask``."""
+        order = self.order[measure]
+        if mask is None:
+            return order[:n]
+
+        found, start, step = [], 0, max(4 * n, 1024)
+        remaining = n
+        while remaining > 0 and start < len(order):
+            window = order[start : start + step]
+            hits = window[mask[window]][:remaining]
+            found.append(hits)
+            remaining -= len(hits)
+            start += step
+            step *= 2  # sparse selections need longer walks
+        return np.concatenate(found) if found else order[:0]
+
+    def check_parity(self, data: pd.DataFrame, n: int = 10, rounds: int = 8):
+        # compare against nlargest on the filtered frame for random selections
+        rng = np.random.default_rng(0)
+        for _ in range(rounds):
+            mask = rng.random(len(data)) < rng.uniform(0.01, 1)
+            for measure in self.order:
+                expected = data[mask].nlargest(n, columns=measure).index.to_numpy()
+                actual = data.index.to_numpy()[self.top(measure, n, mask)]
+                if not np.array_equal(actual, expected):
+                    raise AssertionError(f"Top-{n} index disagrees with nlargest")
+
+    def leaderboards(
+        self,
+        measure: str,
+        n: int,
+        segments: Dict[str, np.ndarray],
+        mask: Optional[np.ndarray] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Top ``n`` positions per segment, each segment given by its own mask."""
+        return {
+            segment: self.top(
+                measure, n, segment_mask if mask is None else segment_mask & mask
+            )
+            for segment, segment_mask in segments.items()
+        }
+
+
+def filter_key(filters: Optional[Dict[str, List[str]]]) -> Tuple:
+    """Canonical, hashable form of a filter selection for cache keys."""
+    return tuple(
+        (dimension, tuple(sorted(values)))
+        for dimension, values in sorted((filters or {}).items())
+    )
+
+
+def gather(data: pd.DataFrame, rows: np.ndarray, columns: List[str]) -> pd.DataFrame:
+    """Materialize only ``columns`` for the selected ``rows``."""
+    if len(rows) == len(data):
+        return data[columns]
+    return data[columns].take(rows)
+
+
+def bin_edges(values: pd.Series, nbins: int) -> np.ndarray:
+    """Evenly spaced edges over the full range, so bins stay put across filters."""
+    return np.histogram_bin_edges(values.to_numpy(dtype="float64"), bins=nbins)
+
+
+def histogram(
+    data: pd.DataFrame, measure: str, edges: np.ndarray, by: str = "Churn"
+) -> pd.DataFrame:
+    """Counts per bin of ``measure`` and group of ``by``, in one vectorized pass.
+
+    Returns one row per (group, bin) with the bin's left/right edges, so the
+    chart payload depends on the number of bins, not on the number of rows.
+    """
+    nbins = len(edges) - 1
+    values = data[measure].to_numpy(dtype="float64")
+    bins = np.clip(np.searchsorted(edges, values, side="right") - 1, 0, nbins - 1)
+    codes, groups = pd.factorize(data[by], sort=True)
+
+    counts = np.bincount(codes * nbins + bins, minlength=len(groups) * nbins)
+    return pd.DataFrame(
+        {
+            by: np.repeat(np.asarray(groups, dtype=object), nbins),
+            "left": np.tile(edges[:-1], len(groups)),
+            "right": np.tile(edges[1:], len(groups)),
+            "count": counts,
+        }
+    )
+
+
+def box_stats(
+    data: pd.DataFrame,
+    measure: str,
+    by: str = "Churn",
+    max_outliers: int = 200,
+    seed: int = 0,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Quartiles, 1.5 IQR whiskers and a capped outlier sample per group of ``by``.
+
+    Returns ``(stats, outliers)``: one row of box statistics per group and at
+    most ``max_outliers`` randomly sampled outlying values per group.
+    """
+    stats_columns = [by, "q1", "median", "q3", "lowerfence", "upperfence", "mean"]
+    values = data[measure].to_numpy(dtype="float64")
+    if not len(values):
+        return pd.DataFrame(columns=stats_columns), pd.DataFrame(columns=[by, measure])
+
+    codes, groups = pd.factorize(data[by], sort=True)
+    grouped = pd.Series(values).groupby(codes)
+    quartiles = grouped.quantile([0.25, 0.5, 0.75]).unstack().to_numpy()
+    q1, median, q3 = quartiles.T
+    iqr = q3 - q1
+
+    inside = (values >= (q1 - 1.5 * iqr)[codes]) & (values <= (q3 + 1.5 * iqr)[codes])
+    within = pd.Series(values[inside]).groupby(codes[inside])
+    stats = pd.DataFrame(
+        {
+            by: np.asarray(groups, dtype=object),
+            "q1": q1,
+            "median": median,
+            "q3": q3,
+            "lowerfence": within.min().reindex(range(len(groups))).to_numpy(),
+            "upperfence": within.max().reindex(range(len(groups))).to_numpy(),
+            "mean": grouped.mean().to_numpy(),
+        }
+    )
+
+    outlying = np.flatnonzero(~inside)
+    outlying = outlying[np.random.default_rng(seed).permutation(len(outlying))]
+    sample = pd.DataFrame({by: codes[outlying], measure: values[outlying]})
+    sample = sample.groupby(by, sort=True).head(max_outliers)
+    sample[by] = np.asarray(groups, dtype=object)[sample[by].to_numpy()]
+
+    return stats, sample.reset_index(drop=True)
+
+
+def stratified_sample(
+    data: pd.DataFrame, n: int, by: str = "Churn", seed: int = 0
+) -> pd.DataFrame:
+    """Up to ``n`` rows drawn per group of ``by`` in proportion to its size."""
+    if len(data) <= n:
+        return data
+
+    rng = np.random.default_rng(seed)
+    codes, _ = pd.factorize(data[by])
+    quotas = np.bincount(codes) * n // len(data)
+    rows = np.concatenate(
+        [
+            rng.choice(np.flatnonzero(codes == code), quota, replace=False)
+            for code, quota in enumerate(quotas)
+        ]
+    )
+    return data.take(np.sort(rows))
+
+
+def histogram2d(
+    data: pd.DataFrame, x: str, y: str, x_edges: np.ndarray, y_edges: np.ndarray
+) -> np.ndarray:
+    """Joint counts of ``x`` and ``y``, laid out with ``y`` on rows for heatmaps."""
+    counts, _, _ = np.histogram2d(
+        data[x].to_numpy(dtype="float64"),
+        data[y].to_numpy(dtype="float64"),
+        bins=[x_edges, y_edges],
+    )
+    return counts.T
+
+
+if __name__ == "__main__":
+    # top-N parity check: python analytics.py path/to/cleaned.parquet
+    import sys
+    import time
+
+    data = pd.read_parquet(sys.argv[1])
+    start = time.perf_counter()
+    top_index = TopIndex(data)
+    print(f"TopIndex built in {time.perf_counter() - start:.2f} s")
+    top_index.check_parity(data)  # raises if a top-N disagrees with nlargest
+    print("Top-N parity with nlargest: ok")
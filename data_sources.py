@@ -0,0 +1,122 @@
+import os
+from typing import Dict, Iterator, Optional
+
+import pandas as pd
+import requests
+from pandas.api.types import union_categoricals
+
+
+# the enumerations in the churn files, parsed straight into categoricals
+CATEGORICAL_COLUMNS = [
+    "gender",
+    "Partner",
+    "Dependents",
+    "PhoneService",
+    "MultipleLines",
+    "InternetService",
+    "OnlineSecurity",
+    "OnlineBackup",
+    "DeviceProtection",
+    "TechSupport",
+    "StreamingTV",
+    "StreamingMovies",
+    "Contract",
+    "PaperlessBilling",
+    "PaymentMethod",
+    "Churn",
+]
+
+SOURCE_DTYPES = {
+    "customerID": "string",
+    "SeniorCitizen": "int8",
+    "tenure": "int32",
+    "MonthlyCharges": "float64",
+    "TotalCharges": "float64",
+    **{col: "category" for col in CATEGORICAL_COLUMNS},
+}
+
+# blank TotalCharges (new customers) are parsed as missing instead of " "
+NA_VALUES = {"TotalCharges": [" ", ""]}
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+class SourceError(RuntimeError):
+    """Raised when a data source cannot be read."""
+
+
+def _csv_options(path: str, dtype: Optional[Dict[str, str]]) -> dict:
+    # only apply dtypes for columns the file actually has
+    header = pd.read_csv(path, nrows=0).columns
+    dtype = SOURCE_DTYPES if dtype is None else dtype
+    return {
+        "dtype": {col: kind for col, kind in dtype.items() if col in header},
+        "na_values": {col: na for col, na in NA_VALUES.items() if col in header},
+        "keep_default_na": True,
+    }
+
+
+def iter_local(
+    path: str,
+    chunksize: int = DEFAULT_CHUNK_SIZE,
+    dtype: Optional[Dict[str, str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Stream a local CSV/TXT or Parquet file as typed chunks."""
+    if not os.path.exists(path):
+        raise SourceError(f"Data file not found: {path}")
+
+    if path.lower().endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+        return
+
+    with pd.read_csv(path, chunksize=chunksize, **_csv_options(path, dtype)) as reader:
+        yield from reader
+
+
+def concat_chunks(chunks: Iterator[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate typed chunks, keeping categoricals as categoricals."""
+    chunks = list(chunks)
+    if len(chunks) == 1:
+        return chunks[0]
+
+    data = pd.concat(chunks, ignore_index=True)
+    for col in chunks[0].columns:
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype):
+            data[col] = pd.Series(
+                union_categoricals([chunk[col] for chunk in chunks]), index=data.index
+            )
+    return data
+
+
+def read_local(
+    path: str,
+    chunksize: int = DEFAULT_CHUNK_SIZE,
+    dtype: Optional[Dict[str, str]] = None,
+) -> pd.DataFrame:
+    return concat_chunks(iter_local(path, chunksize=chunksize, dtype=dtype))
+
+
+def read_github(url: str) -> pd.DataFrame:
+    """Optional remote adapter for CSVs rendered by GitHub's blob JSON page."""
+    try:
+        response = requests.get(url, timeout=30)
+        response.raise_for_status()
+        data_github = response.json()["payload"]["blob"]["csv"]
+    except (requests.RequestException, ValueError, KeyError) as error:
+        raise SourceError(f"Failed to download data from Github: {error}")
+
+    df = pd.DataFrame(data_github[1:], columns=data_github[0])
+    df["TotalCharges"] = df["TotalCharges"].replace({" ": None, "": None})
+
+    dtype = {col: kind for col, kind in SOURCE_DTYPES.items() if col in df.columns}
+    return df.astype(dtype)
+
+
+def load_source(location: str, **options) -> pd.DataFrame:
+    """Read a dataset from a local path, or from GitHub when given a URL."""
+    if location.startswith(("http://", "https://")):
+        return read_github(location)
+    return read_local(location, **options)
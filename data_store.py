@@ -0,0 +1,332 @@
+import glob
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data_sources import load_source
+from streaming_stats import QuantileSketch
+
+
+CACHE_DIR = "./data/cache"
+INCREMENTAL_DIR = os.path.join(CACHE_DIR, "incremental")
+INCOMING_DIR = "./data/incoming"  # nightly customer deltas are dropped here
+
+SMART_FEATURES = [
+    "OnlineSecurity",
+    "OnlineBackup",
+    "DeviceProtection",
+    "TechSupport",
+    "StreamingTV",
+    "StreamingMovies",
+]
+
+# floats are stored as float32 only when no value moves by half a cent or more
+FLOAT32_TOLERANCE = 0.005
+
+# content hashes of local sources, keyed by (path, size, mtime) so unchanged
+# files are not re-read on every rerun
+_file_hashes = {}
+
+
+def clean_data(data_db: pd.DataFrame, data_github: pd.DataFrame) -> pd.DataFrame:
+    dtypes = {"tenure": "int32", "MonthlyCharges": "float64", "TotalCharges": "float64"}
+
+    smart_features = [
+        "OnlineSecurity",
+        "OnlineBackup",
+        "DeviceProtection",
+        "TechSupport",
+        "StreamingTV",
+        "StreamingMovies",
+    ]
+    data_db[smart_features] = data_db[smart_features].fillna("No internet service")
+    data_db["MultipleLines"] = data_db["MultipleLines"].fillna("No phone service")
+    data_db["TotalCharges"] = data_db["TotalCharges"].fillna(
+        data_db["TotalCharges"].mean()
+    )
+    data_db = data_db.dropna(subset=["Churn"])
+    data_db = data_db.replace({True: "Yes", False: "No"})
+
+    data_github["SeniorCitizen"] = data_github["SeniorCitizen"].replace(
+        {1: "Yes", 0: "No"}
+    )
+
+    cleaned_data = pd.concat([data_db, data_github], axis=0).reset_index(drop=True)
+
+    cleaned_data["TotalCharges"] = cleaned_data["TotalCharges"].replace({" ": np.nan})
+    cleaned_data = cleaned_data.astype(dtypes)
+    cleaned_data["TotalCharges"] = cleaned_data["TotalCharges"].fillna(
+        cleaned_data["TotalCharges"].median()
+    )
+    cleaned_data["Churn"] = cleaned_data["Churn"].astype("category")
+
+    return cleaned_data
+
+
+def clean_delta(delta: pd.DataFrame, sketch: QuantileSketch) -> pd.DataFrame:
+    """Clean newly arrived rows from either source format without a full pass.
+
+    Missing TotalCharges are imputed with the median of the running sketch
+    instead of a median over the whole dataset.
+    """
+    delta = delta.copy()
+    for col in delta.columns:
+        if isinstance(delta[col].dtype, pd.CategoricalDtype):
+            delta[col] = delta[col].astype(object)
+
+    delta[SMART_FEATURES] = delta[SMART_FEATURES].fillna("No internet service")
+    delta["MultipleLines"] = delta["MultipleLines"].fillna("No phone service")
+    delta = delta.dropna(subset=["Churn"])
+    # the first source's flags arrive as bools, or as "True"/"False" once the
+    # typed reader has made them categorical
+    flags = delta.select_dtypes(include=["object", "bool"]).columns
+    delta[flags] = delta[flags].replace(
+        {True: "Yes", False: "No", "True": "Yes", "False": "No"}
+    )
+    delta["SeniorCitizen"] = delta["SeniorCitizen"].replace(
+        {1: "Yes", 0: "No", "1": "Yes", "0": "No"}
+    )
+
+    delta["TotalCharges"] = pd.to_numeric(
+        delta["TotalCharges"].replace({" ": np.nan}), errors="coerce"
+    )
+    delta = delta.astype(
+        {"tenure": "int32", "MonthlyCharges": "float64", "TotalCharges": "float64"}
+    )
+    delta["TotalCharges"] = delta["TotalCharges"].fillna(sketch.median())
+    delta["customerID"] = delta["customerID"].astype(str)
+
+    return delta.reset_index(drop=True)
+
+
+def compact_frame(data: pd.DataFrame) -> pd.DataFrame:
+    """Shrink the cleaned frame to compact dtypes.
+
+    Enumerations (including the Yes/No flags, so ``== "Yes"`` comparisons keep
+    working) become categoricals with int8 codes, integers are downcast,
+    floats become float32 where precision allows, and IDs use Arrow strings.
+    """
+    compact = {}
+    for col in data.columns:
+        values = data[col]
+        if col == "customerID":
+            compact[col] = values.astype("string[pyarrow]")
+        elif pd.api.types.is_bool_dtype(values):
+            compact[col] = values
+        elif pd.api.types.is_integer_dtype(values):
+            compact[col] = pd.to_numeric(values, downcast="integer")
+        elif pd.api.types.is_float_dtype(values):
+            narrow = values.astype("float32")
+            lossless = (narrow.astype("float64") - values).abs().max()
+            compact[col] = narrow if lossless < FLOAT32_TOLERANCE else values
+        else:
+            compact[col] = values.astype("category")
+
+    return pd.DataFrame(compact, index=data.index)
+
+
+def memory_report(before: pd.DataFrame, after: pd.DataFrame) -> Tuple[int, int]:
+    return (
+        int(before.memory_usage(deep=True).sum()),
+        int(after.memory_usage(deep=True).sum()),
+    )
+
+
+def file_fingerprint(path: str) -> str:
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                digest.update(block)
+        _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
+
+
+def code_version() -> str:
+    # any edit to the cleaning code invalidates previously cached output,
+    # including the delta parts, which are reset along with the base
+    digest = hashlib.sha256()
+    for func in (clean_data, clean_delta):
+        digest.update(inspect.getsource(func).encode())
+    return digest.hexdigest()
+
+
+def fingerprint(sources: Dict[str, str]) -> str:
+    """Fingerprint named sources together with the cleaning code.
+
+    Local files contribute their content hash; anything else (e.g. a URL) is
+    treated as immutable and contributes its address.
+    """
+    digest = hashlib.sha256(code_version().encode())
+    for name in sorted(sources):
+        location = sources[name]
+        token = file_fingerprint(location) if os.path.isfile(location) else location
+        digest.update(f"{name}={token};".encode())
+    return digest.hexdigest()[:16]
+
+
+def cached_clean_data(
+    fingerprint: str,
+    build: Callable[[], pd.DataFrame],
+    cache_dir: str = CACHE_DIR,
+) -> pd.DataFrame:
+    """Read the cleaned dataset for ``fingerprint`` from Parquet, building it once.
+
+    ``build`` runs only on a miss; its output replaces any older snapshot.
+    """
+    path = os.path.join(cache_dir, f"cleaned-{fingerprint}.parquet")
+    if os.path.exists(path):
+        return pd.read_parquet(path, memory_map=True)
+
+    cleaned_data = build()
+
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    os.close(fd)
+    try:
+        cleaned_data.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    for stale in glob.glob(os.path.join(cache_dir, "cleaned-*.parquet")):
+        if stale != path:
+            os.remove(stale)
+
+    return cleaned_data
+
+
+class IncrementalStore:
+    """Delta parts layered over a cleaned base snapshot.
+
+    Each incoming file is cleaned once and written as its own Parquet part
+    holding only new or changed customers (by ``customerID``). A running
+    TotalCharges sketch is kept alongside for imputation. The store resets
+    whenever the base snapshot changes or a full rebuild is requested.
+    """
+
+    def __init__(self, store_dir: str = INCREMENTAL_DIR):
+        self.store_dir = store_dir
+        self.state_path = os.path.join(store_dir, "state.json")
+
+    def _load_state(self) -> dict:
+        try:
+            with open(self.state_path) as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self, state: dict):
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(state, file)
+        os.replace(tmp_path, self.state_path)
+
+    def reset(self):
+        shutil.rmtree(self.store_dir, ignore_errors=True)
+
+    def sync(
+        self,
+        base: pd.DataFrame,
+        base_fingerprint: str,
+        delta_paths: List[str],
+        full_rebuild: bool = False,
+    ) -> pd.DataFrame:
+        """Apply unseen delta files and return base plus all applied deltas."""
+        state = self._load_state()
+        if full_rebuild or state.get("base") != base_fingerprint:
+            self.reset()
+            state = {}
+        os.makedirs(self.store_dir, exist_ok=True)
+
+        if not state:
+            sketch = QuantileSketch()
+            sketch.add(base["TotalCharges"])
+            state = {"base": base_fingerprint, "applied": {}, "parts": []}
+        else:
+            sketch = QuantileSketch.from_dict(state["sketch"])
+
+        parts = [
+            pd.read_parquet(os.path.join(self.store_dir, part))
+            for part in state["parts"]
+        ]
+        current = _overlay(base, parts)
+
+        for path in delta_paths:
+            delta_hash = file_fingerprint(path)
+            if delta_hash in state["applied"]:
+                continue
+
+            cleaned = clean_delta(load_source(path), sketch)
+            changed = _changed_rows(current, cleaned)
+
+            previous = current.loc[
+                current["customerID"].isin(changed["customerID"]), "TotalCharges"
+            ]
+            sketch.remove(previous)
+            sketch.add(changed["TotalCharges"])
+
+            part = f"part-{len(state['parts']):05d}.parquet"
+            changed.to_parquet(os.path.join(self.store_dir, part), index=False)
+            state["parts"].append(part)
+            state["applied"][delta_hash] = len(changed)
+            current = _overlay(current, [changed])
+
+        state["sketch"] = sketch.to_dict()
+        self._save_state(state)
+
+        current["Churn"] = current["Churn"].astype("category")
+        return current
+
+
+def _overlay(base: pd.DataFrame, parts: List[pd.DataFrame]) -> pd.DataFrame:
+    # later rows win for a customerID that appears more than once
+    if not parts:
+        return base
+    frames = [base.astype({"Churn": object})] + [
+        part.astype({"Churn": object}) for part in parts
+    ]
+    combined = pd.concat(frames, ignore_index=True)
+    return combined.drop_duplicates(subset="customerID", keep="last").reset_index(
+        drop=True
+    )
+
+
+def _changed_rows(current: pd.DataFrame, cleaned: pd.DataFrame) -> pd.DataFrame:
+    cleaned = cleaned.drop_duplicates(subset="customerID", keep="last")
+    columns = [col for col in current.columns if col in cleaned.columns]
+    known = current[columns].astype({"Churn": object}).set_index("customerID")
+    incoming = cleaned[columns].set_index("customerID")
+
+    is_new = ~incoming.index.isin(known.index)
+    existing = incoming[~is_new]
+    differs = (
+        existing.astype(str) != known.loc[existing.index, existing.columns].astype(str)
+    ).any(axis=1)
+    keep = incoming.index[is_new].union(existing.index[differs.to_numpy()])
+
+    return cleaned[cleaned["customerID"].isin(keep)].reset_index(drop=True)
+
+
+def clear_cache(cache_dir: str = CACHE_DIR):
+    """Drop the cleaned snapshot and all delta parts to force a full rebuild."""
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def incoming_files(incoming_dir: str = INCOMING_DIR) -> List[str]:
+    patterns = ("*.csv", "*.txt", "*.parquet")
+    return sorted(
+        path
+        for pattern in patterns
+        for path in glob.glob(os.path.join(incoming_dir, pattern))
+    )
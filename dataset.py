@@ -0,0 +1,83 @@
+import os
+from typing import NamedTuple
+
+import pandas as pd
+import streamlit as st
+
+from data_sources import SourceError, load_source
+from data_store import (
+    IncrementalStore,
+    cached_clean_data,
+    clean_data,
+    clear_cache,
+    compact_frame,
+    fingerprint,
+    incoming_files,
+    memory_report,
+)
+
+
+URL_GITHUB = (
+    "https://github.com/Azubi-Africa/Career_Accelerator_LP2-Classifcation/"
+    + "blob/main/LP2_Telco-churn-second-2000.csv"
+)
+PATH_DATABASE = "./data/Telco-churn-first-3000.csv"
+
+# the second dataset ships with the repo; set CHURN_SECOND_SOURCE to another
+# local file or to the URL_GITHUB address to read it from elsewhere
+SECOND_SOURCE = os.environ.get(
+    "CHURN_SECOND_SOURCE", "./data/LP2_Telco-churn-second-2000.txt"
+)
+
+
+class Dataset(NamedTuple):
+    """The cleaned churn data shared by every session and page.
+
+    ``frame`` is not copied per session; callers that modify it must take
+    their own ``.copy()``.
+    """
+
+    frame: pd.DataFrame
+    version: str  # fingerprint of the sources, deltas and cleaning code
+    bytes_before: int  # footprint before compact dtypes
+    bytes_after: int
+
+
+# cleaned data is persisted as Parquet keyed by the sources and cleaning code,
+# so the sources are only read and cleaned again when one of them changes.
+# Files dropped in ./data/incoming are cleaned once and layered on top. One
+# version is held per process and shared by all sessions.
+@st.cache_resource(show_spinner="Loading Cleaned Data...", max_entries=1)
+def _load_dataset(base_fingerprint: str, data_fingerprint: str) -> Dataset:
+    def build() -> pd.DataFrame:
+        df_database = pd.read_csv(PATH_DATABASE)
+        try:
+            df_github = load_source(SECOND_SOURCE)
+        except SourceError as error:
+            st.error(str(error))
+            st.stop()
+        return clean_data(data_db=df_database, data_github=df_github)
+
+    base = cached_clean_data(base_fingerprint, build=build)
+    cleaned_data = IncrementalStore().sync(base, base_fingerprint, incoming_files())
+
+    compact_data = compact_frame(cleaned_data)
+    bytes_before, bytes_after = memory_report(cleaned_data, compact_data)
+
+    return Dataset(compact_data, data_fingerprint, bytes_before, bytes_after)
+
+
+def get_dataset() -> Dataset:
+    """Return the shared dataset, loading it on first use from any page."""
+    sources = {"database": PATH_DATABASE, "github": SECOND_SOURCE}
+    deltas = {f"incoming:{os.path.basename(p)}": p for p in incoming_files()}
+    return _load_dataset(
+        base_fingerprint=fingerprint(sources),
+        data_fingerprint=fingerprint({**sources, **deltas}),
+    )
+
+
+def rebuild_dataset():
+    """Drop every cached layer so the next ``get_dataset`` re-cleans all sources."""
+    clear_cache()
+    _load_dataset.clear()
@@ -0,0 +1,336 @@
+import atexit
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+
+DB_PATH = "./data/history.db"
+CSV_PATH = "./data/history.csv"  # legacy append-only store, migrated once
+
+NUMERIC_COLUMNS = ["tenure", "MonthlyCharges", "TotalCharges"]
+FEATURE_COLUMNS = NUMERIC_COLUMNS + [
+    "SeniorCitizen",
+    "Partner",
+    "Dependents",
+    "MultipleLines",
+    "InternetService",
+    "OnlineSecurity",
+    "OnlineBackup",
+    "DeviceProtection",
+    "TechSupport",
+    "StreamingTV",
+    "StreamingMovies",
+    "Contract",
+    "PaperlessBilling",
+    "PaymentMethod",
+]
+HISTORY_COLUMNS = FEATURE_COLUMNS + ["day_of_prediction", "ModelUsed", "Prediction"]
+INDEXED_COLUMNS = ["day_of_prediction", "ModelUsed", "Prediction"]
+
+_initialized = set()
+_init_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def connect(db_path: str = DB_PATH) -> Iterator[sqlite3.Connection]:
+    # one short-lived connection per operation, committed and closed on exit
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+def init_db(db_path: str = DB_PATH, csv_path: str = CSV_PATH):
+    """Create the history table and indexes, migrating the legacy CSV once."""
+    columns = ", ".join(
+        f'"{col}" {"REAL" if col in NUMERIC_COLUMNS else "TEXT"}'
+        for col in HISTORY_COLUMNS
+    )
+    with connect(db_path) as conn:
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS history (id INTEGER PRIMARY KEY, {columns})"
+        )
+        for col in INDEXED_COLUMNS:
+            conn.execute(
+                f'CREATE INDEX IF NOT EXISTS idx_history_{col} ON history ("{col}")'
+            )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+
+    migrate_csv(db_path=db_path, csv_path=csv_path)
+
+
+def ensure_db(db_path: str = DB_PATH, csv_path: str = CSV_PATH):
+    # schema setup and migration run once per process
+    with _init_lock:
+        if db_path not in _initialized:
+            init_db(db_path=db_path, csv_path=csv_path)
+            _initialized.add(db_path)
+
+
+def migrate_csv(db_path: str = DB_PATH, csv_path: str = CSV_PATH) -> int:
+    """Copy rows from the legacy history.csv into SQLite, returning the count.
+
+    The CSV is renamed afterwards so the migration never runs twice.
+    """
+    if not os.path.exists(csv_path):
+        return 0
+
+    migrated = 0
+    with connect(db_path) as conn:
+        # take the write lock first so racing processes migrate only once
+        conn.execute("BEGIN IMMEDIATE")
+        done = conn.execute(
+            "SELECT value FROM meta WHERE key = 'csv_migrated'"
+        ).fetchone()
+        if done is None:
+            for chunk in pd.read_csv(csv_path, chunksize=50_000):
+                # appends re-wrote the header line, drop those copies
+                repeated = (chunk.astype(str) == list(chunk.columns)).all(axis=1)
+                migrated += _insert(conn, chunk[~repeated])
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('csv_migrated', ?)",
+                (str(migrated),),
+            )
+
+    try:
+        os.replace(csv_path, csv_path + ".migrated")
+    except FileNotFoundError:
+        pass  # renamed by the process that migrated it
+    return migrated
+
+
+def _insert(conn: sqlite3.Connection, rows: pd.DataFrame) -> int:
+    rows = rows.reindex(columns=HISTORY_COLUMNS)
+    rows[NUMERIC_COLUMNS] = rows[NUMERIC_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    rows = rows.astype(object).where(rows.notna(), None)
+
+    placeholders = ", ".join("?" for _ in HISTORY_COLUMNS)
+    names = ", ".join(f'"{col}"' for col in HISTORY_COLUMNS)
+    conn.executemany(
+        f"INSERT INTO history ({names}) VALUES ({placeholders})",
+        rows.itertuples(index=False, name=None),
+    )
+    return len(rows)
+
+
+def append_history(rows: pd.DataFrame, db_path: str = DB_PATH) -> int:
+    ensure_db(db_path)
+    with connect(db_path) as conn:
+        return _insert(conn, rows)
+
+
+def _where(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    models: Optional[List[str]] = None,
+    predictions: Optional[List[str]] = None,
+) -> Tuple[str, list]:
+    # every condition hits one of the indexed columns
+    clauses, params = [], []
+    if start_date is not None:
+        clauses.append("day_of_prediction >= ?")
+        params.append(start_date.strftime("%Y-%m-%d"))
+    if end_date is not None:
+        clauses.append("day_of_prediction < ?")
+        params.append((end_date + timedelta(days=1)).strftime("%Y-%m-%d"))
+    for column, values in (("ModelUsed", models), ("Prediction", predictions)):
+        if values:
+            clauses.append(f'"{column}" IN ({", ".join("?" for _ in values)})')
+            params.extend(values)
+
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def count_history(db_path: str = DB_PATH, **filters) -> int:
+    ensure_db(db_path)
+    where, params = _where(**filters)
+    with connect(db_path) as conn:
+        row = conn.execute(f"SELECT COUNT(*) FROM history{where}", params).fetchone()
+    return row[0]
+
+
+def query_history(
+    limit: int, offset: int = 0, db_path: str = DB_PATH, **filters
+) -> pd.DataFrame:
+    """Return one page of history rows, newest first, matching ``filters``.
+
+    ``filters`` are ``start_date``, ``end_date``, ``models`` and ``predictions``.
+    """
+    ensure_db(db_path)
+    where, params = _where(**filters)
+    names = ", ".join(f'"{col}"' for col in HISTORY_COLUMNS)
+    with connect(db_path) as conn:
+        return pd.read_sql_query(
+            f"SELECT {names} FROM history{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+            conn,
+            params=params + [limit, offset],
+        )
+
+
+def history_bounds(db_path: str = DB_PATH) -> Tuple[Optional[str], Optional[str]]:
+    # MIN/MAX on an indexed column are answered from the index; only values
+    # that start like a date count
+    ensure_db(db_path)
+    with connect(db_path) as conn:
+        return conn.execute(
+            "SELECT MIN(day_of_prediction), MAX(day_of_prediction) FROM history "
+            "WHERE day_of_prediction GLOB '[0-9][0-9][0-9][0-9]-*'"
+        ).fetchone()
+
+
+def distinct_values(column: str, db_path: str = DB_PATH) -> List[str]:
+    if column not in INDEXED_COLUMNS:
+        raise ValueError(f"{column} is not an indexed history column")
+    ensure_db(db_path)
+    with connect(db_path) as conn:
+        rows = conn.execute(
+            f'SELECT DISTINCT "{column}" FROM history ORDER BY "{column}"'
+        ).fetchall()
+    return [value for (value,) in rows if value is not None]
+
+
+class HistoryWriter:
+    """Background writer that batches history rows into SQLite transactions.
+
+    ``submit`` only enqueues, so a prediction never waits on disk I/O. A
+    daemon thread drains the queue and commits each batch atomically; SQLite's
+    file locking keeps writers in other processes from interleaving.
+    """
+
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        max_batch: int = 500,
+        flush_interval: float = 0.5,
+        retries: int = 3,
+    ):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.retries = retries
+
+        self.rows_written = 0
+        self.batches_written = 0
+        self.rows_dropped = 0
+        self.last_write_seconds = 0.0
+        self.total_write_seconds = 0.0
+
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="history-writer", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, rows: pd.DataFrame):
+        self._queue.put(rows.copy())
+
+    def _drain(self, block: bool) -> list:
+        batch, size = [], 0
+        try:
+            rows = self._queue.get(timeout=self.flush_interval if block else 0)
+        except queue.Empty:
+            return batch
+        batch.append(rows)
+        size += len(rows)
+        while size < self.max_batch:
+            try:
+                rows = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(rows)
+            size += len(rows)
+        return batch
+
+    def _write(self, batch: list):
+        size = sum(len(rows) for rows in batch)
+        try:
+            rows = pd.concat(batch, ignore_index=True)
+            for attempt in range(1, self.retries + 1):
+                start = time.perf_counter()
+                try:
+                    append_history(rows, db_path=self.db_path)
+                except sqlite3.Error:
+                    logger.exception("History write failed (attempt %d)", attempt)
+                    time.sleep(0.1 * attempt)
+                    continue
+                elapsed = time.perf_counter() - start
+                self.last_write_seconds = elapsed
+                self.total_write_seconds += elapsed
+                self.rows_written += len(rows)
+                self.batches_written += 1
+                return
+        except Exception:
+            # other errors would fail again on retry; drop the rows, keep the thread
+            logger.exception("History rows could not be written")
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+        self.rows_dropped += size
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._drain(block=True)
+            if batch:
+                self._write(batch)
+        # drain whatever is left once a stop is requested
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                break
+            self._write(batch)
+
+    def flush(self, timeout: float = 10.0):
+        """Wait until every submitted row has been committed."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self, timeout: float = 10.0):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize(),
+            "rows_written": self.rows_written,
+            "batches_written": self.batches_written,
+            "rows_dropped": self.rows_dropped,
+            "last_write_ms": self.last_write_seconds * 1000,
+            "avg_write_ms": (
+                self.total_write_seconds / self.batches_written * 1000
+                if self.batches_written
+                else 0.0
+            ),
+        }
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> HistoryWriter:
+    # one writer thread per process, flushed when the interpreter exits
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = HistoryWriter()
+            atexit.register(_writer.close)
+        return _writer
@@ -0,0 +1,552 @@
+import time
+import warnings
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from result_cache import ResultCache
+
+
+# maps the model names shown on the Predict page to keys in the model artifact
+MODEL_KEYS = {
+    "Random Forest": "random_forest_classifier",
+    "XGBoost Classifier": "gradient_boosting_classifier",
+}
+
+NUMERICAL_FEATURES = ["tenure", "MonthlyCharges", "TotalCharges"]
+
+# raw files encode these flags as 0/1 or True/False, the model expects Yes/No
+BINARY_FEATURES = ["SeniorCitizen", "Partner", "Dependents", "PaperlessBilling"]
+
+DEFAULT_CHUNK_SIZE = 10_000
+
+# closed option lists offered by the prediction form, used when the fitted
+# encoder does not expose its categories
+CATEGORY_OPTIONS = {
+    "SeniorCitizen": ["Yes", "No"],
+    "Partner": ["Yes", "No"],
+    "Dependents": ["Yes", "No"],
+    "MultipleLines": ["Yes", "No"],
+    "InternetService": ["DSL", "Fiber optic", "No"],
+    "OnlineSecurity": ["No", "Yes", "No internet service"],
+    "OnlineBackup": ["Yes", "No", "No internet service"],
+    "DeviceProtection": ["Yes", "No", "No internet service"],
+    "TechSupport": ["Yes", "No", "No internet service"],
+    "StreamingTV": ["Yes", "No", "No internet service"],
+    "StreamingMovies": ["Yes", "No", "No internet service"],
+    "Contract": ["Month-to-month", "One year", "Two year"],
+    "PaperlessBilling": ["Yes", "No"],
+    "PaymentMethod": [
+        "Electronic check",
+        "Mailed check",
+        "Bank transfer (automatic)",
+        "Credit card (automatic)",
+    ],
+}
+
+# clean_data fills these when a customer does not have the underlying service
+SERVICE_DEFAULTS = {
+    "MultipleLines": "No phone service",
+    **{
+        col: "No internet service"
+        for col in [
+            "OnlineSecurity",
+            "OnlineBackup",
+            "DeviceProtection",
+            "TechSupport",
+            "StreamingTV",
+            "StreamingMovies",
+        ]
+    },
+}
+
+UNKNOWN_CATEGORY = "__unknown__"
+
+# the compiled plan feeds plain arrays to classifiers fitted on DataFrames
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def get_classifier(loaded_components: dict, selected_model: str):
+    return loaded_components[
+        MODEL_KEYS.get(selected_model, "gradient_boosting_classifier")
+    ]
+
+
+def transform_features(loaded_components: dict, input_df: pd.DataFrame) -> pd.DataFrame:
+    """Run the fitted preprocessing steps on a frame of raw customer features.
+
+    :param loaded_components: components unpickled from the model artifact
+    :param input_df: frame with the ``reference_features`` columns
+    :return: frame holding the ``selected_features`` expected by the classifiers
+    """
+    cat_preprocessor = loaded_components["cat_preprocessor"]
+    transformed_columns = loaded_components["transformed_columns"]
+    num_cols = loaded_components["numerical_columns"]
+    num_transformer = loaded_components["num_transformer"]
+    selected_features = loaded_components["selected_features"]
+
+    prepared = pd.DataFrame(
+        cat_preprocessor.transform(input_df),
+        columns=transformed_columns,
+        index=input_df.index,
+    )
+    prepared[num_cols] = num_transformer.transform(prepared[num_cols])
+
+    return prepared[selected_features]
+
+
+def _yes_no(value, flag: bool):
+    # raw files spell Yes/No as True/False (objects or strings), flags also as 1/0
+    if isinstance(value, (bool, np.bool_)):
+        return "Yes" if value else "No"
+    if flag and isinstance(value, (int, np.integer, float)) and value in (0, 1):
+        return "Yes" if value else "No"
+    if isinstance(value, str):
+        value = value.strip()
+        spellings = {"True": "Yes", "False": "No"}
+        if flag:
+            spellings.update({"1": "Yes", "0": "No"})
+        return spellings.get(value, value)
+    return value
+
+
+def _allowed_categories(loaded_components: dict, feature: str) -> Optional[List[str]]:
+    categories = _find_categories(loaded_components.get("cat_preprocessor"), feature)
+    if categories is None and feature in CATEGORY_OPTIONS:
+        categories = list(CATEGORY_OPTIONS[feature])
+        if feature in SERVICE_DEFAULTS:
+            categories.append(SERVICE_DEFAULTS[feature])
+    return categories
+
+
+def normalize_batch(loaded_components: dict, data: pd.DataFrame) -> pd.DataFrame:
+    """Project an uploaded frame onto ``reference_features`` with model-ready dtypes.
+
+    Yes/No spellings and blank service columns are cleaned as in ``clean_data``.
+    Raises ``ValueError`` naming the missing columns when the upload is
+    incomplete.
+    """
+    reference_features = list(loaded_components["reference_features"])
+    missing = [col for col in reference_features if col not in data.columns]
+    if missing:
+        raise ValueError(f"Uploaded file is missing columns: {', '.join(missing)}")
+
+    batch = data[reference_features].copy()
+    for col in reference_features:
+        if col in NUMERICAL_FEATURES:
+            batch[col] = pd.to_numeric(batch[col], errors="coerce")
+        else:
+            flag = col in BINARY_FEATURES
+            values = batch[col].astype(object).map(lambda v: _yes_no(v, flag))
+            if col in SERVICE_DEFAULTS:
+                values = values.fillna(SERVICE_DEFAULTS[col])
+            batch[col] = values.astype(str)
+
+    # mirror clean_data: blank TotalCharges are imputed with the median
+    for col in NUMERICAL_FEATURES:
+        if col in batch and batch[col].isna().any():
+            batch[col] = batch[col].fillna(batch[col].median())
+
+    return batch
+
+
+def unknown_values(loaded_components: dict, batch: pd.DataFrame) -> pd.Series:
+    """Columns of a normalized batch holding values the model has not seen.
+
+    One comma-separated string per row, empty when every value is known.
+    """
+    flags = pd.Series("", index=batch.index, dtype=object)
+    for col in batch.columns:
+        if col in NUMERICAL_FEATURES:
+            continue
+        allowed = _allowed_categories(loaded_components, col)
+        if allowed is not None:
+            flags += np.where(batch[col].isin(allowed), "", f"{col}, ")
+    return flags.str.removesuffix(", ")
+
+
+def iter_chunks(data: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(data), chunk_size):
+        yield data.iloc[start : start + chunk_size]
+
+
+def score_batch(
+    loaded_components: dict,
+    data: pd.DataFrame,
+    selected_model: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    plan: Optional["InferencePlan"] = None,
+) -> Tuple[pd.DataFrame, float]:
+    """Score every row of ``data`` and return the scored frame with rows/s.
+
+    Preprocessing and ``predict_proba`` run once per chunk rather than once
+    per customer, which keeps memory bounded for large uploads. With a
+    compiled ``plan`` the chunks are encoded from its lookup tables. Values
+    the model has not seen are encoded as the fitted encoder encodes unknown
+    categories, and the affected columns are listed in ``UnknownValues``.
+    """
+    start = time.perf_counter()
+
+    batch = normalize_batch(loaded_components, data)
+    unknown = unknown_values(loaded_components, batch)
+    classifier = get_classifier(loaded_components, selected_model)
+    classes = np.asarray(classifier.classes_)
+    positive = int(np.flatnonzero(classes == "Yes")[0]) if "Yes" in classes else -1
+
+    probabilities = np.empty(len(batch), dtype="float64")
+    predictions = np.empty(len(batch), dtype=object)
+    offset = 0
+    for chunk in iter_chunks(batch, chunk_size):
+        features = None
+        if plan is not None:
+            try:
+                features = plan.encode_frame(chunk)
+            except KeyError:
+                pass  # value the encoder cannot map, use the sklearn path
+        if features is None:
+            features = transform_features(loaded_components, chunk)
+        proba = classifier.predict_proba(features)
+        stop = offset + len(chunk)
+        probabilities[offset:stop] = proba[:, positive]
+        predictions[offset:stop] = classes[proba.argmax(axis=1)]
+        offset = stop
+
+    scored = data.copy()
+    scored["ModelUsed"] = selected_model
+    scored["ChurnProbability"] = (probabilities * 100).round(2)
+    scored["Prediction"] = predictions
+    scored["UnknownValues"] = unknown.to_numpy()
+
+    elapsed = time.perf_counter() - start
+    throughput = len(batch) / elapsed if elapsed > 0 else float("inf")
+
+    return scored, throughput
+
+
+class PlanCompileError(RuntimeError):
+    """Raised when the fitted preprocessors cannot be reduced to a lookup plan."""
+
+
+def _find_categories(transformer, feature: str) -> Optional[List[str]]:
+    # walk ColumnTransformer / Pipeline nesting looking for a fitted encoder
+    for _, step, columns in getattr(transformer, "transformers_", []):
+        columns = list(columns) if not isinstance(columns, str) else [columns]
+        if feature not in columns:
+            continue
+        for candidate in [step, *[s for _, s in getattr(step, "steps", [])]]:
+            if hasattr(candidate, "categories_"):
+                categories = candidate.categories_[columns.index(feature)]
+                return [str(category) for category in categories]
+    return None
+
+
+class InferencePlan:
+    """Preprocessing of the model artifact compiled down to flat NumPy arrays.
+
+    A feature vector is assembled as ``base`` plus one precomputed table row
+    per categorical feature plus an affine transform of the numeric inputs,
+    all laid out directly in ``selected_features`` order. Each table has one
+    row per known category and, when the encoder tolerates unseen values, a
+    final row holding its encoding of an unknown category.
+    """
+
+    def __init__(
+        self,
+        features: List[str],
+        base: np.ndarray,
+        lookups: Dict[str, Dict[str, int]],
+        tables: Dict[str, np.ndarray],
+        unknown_rows: Dict[str, Optional[int]],
+        numeric_features: List[str],
+        numeric_slots: np.ndarray,
+        scale: np.ndarray,
+        offset: np.ndarray,
+    ):
+        self.features = features
+        self.base = base
+        self.lookups = lookups
+        self.tables = tables
+        self.unknown_rows = unknown_rows
+        self.indexes = {f: pd.Index(list(lookup)) for f, lookup in lookups.items()}
+        self.numeric_features = numeric_features
+        self.numeric_slots = numeric_slots
+        self.scale = scale
+        self.offset = offset
+
+        # one stacked table so a single row is one gather and one sum
+        self.categorical_features = list(tables)
+        self.row_offsets = {}
+        start = 0
+        for feature in self.categorical_features:
+            self.row_offsets[feature] = start
+            start += len(tables[feature])
+        self.table = np.vstack([tables[f] for f in self.categorical_features])
+
+    @classmethod
+    def compile(cls, loaded_components: dict) -> "InferencePlan":
+        features = list(loaded_components["reference_features"])
+        numeric_features = [
+            f for f in features if f in list(loaded_components["numerical_columns"])
+        ]
+        categorical_features = [f for f in features if f not in numeric_features]
+
+        categories = {}
+        for feature in categorical_features:
+            found = _find_categories(loaded_components["cat_preprocessor"], feature)
+            categories[feature] = found or CATEGORY_OPTIONS.get(feature)
+            if not categories[feature]:
+                raise PlanCompileError(f"No known categories for {feature}")
+
+        # probe the fitted pipeline one feature at a time from a base profile
+        base_row = {f: categories[f][0] for f in categorical_features}
+        base_row.update({f: "0" for f in numeric_features})
+        probes = [base_row]
+        for feature in categorical_features:
+            probes += [{**base_row, feature: c} for c in categories[feature]]
+        for feature in numeric_features:
+            probes += [{**base_row, feature: "1"}, {**base_row, feature: "37.5"}]
+
+        encoded = _reference_vectors(loaded_components, probes)
+        base = encoded[0].copy()
+
+        owned = np.zeros(base.shape, dtype=bool)
+        lookups, tables, feature_slots = {}, {}, {}
+        row = 1
+        for feature in categorical_features:
+            block = encoded[row : row + len(categories[feature])]
+            row += len(categories[feature])
+            slots = (block != base).any(axis=0)
+            if (slots & owned).any():
+                raise PlanCompileError(f"Encoded columns of {feature} overlap")
+            owned |= slots
+            feature_slots[feature] = slots
+            tables[feature] = np.where(slots, block, 0.0)
+            lookups[feature] = {c: i for i, c in enumerate(categories[feature])}
+
+        unknown_rows = _probe_unknown(
+            loaded_components, base_row, base, feature_slots, tables
+        )
+
+        numeric_slots, scale, offset = [], [], []
+        for feature in numeric_features:
+            one, other = encoded[row], encoded[row + 1]
+            row += 2
+            changed = np.flatnonzero(one != base)
+            if len(changed) != 1 or owned[changed[0]]:
+                raise PlanCompileError(f"{feature} is not a single scaled column")
+            slot = changed[0]
+            owned[slot] = True
+            numeric_slots.append(slot)
+            scale.append(one[slot] - base[slot])
+            offset.append(base[slot])
+            if not np.isclose(other[slot], 37.5 * scale[-1] + offset[-1]):
+                raise PlanCompileError(f"{feature} is not scaled linearly")
+
+        # only columns no input can change stay in the constant part
+        base[owned] = 0.0
+
+        plan = cls(
+            features,
+            base,
+            lookups,
+            tables,
+            unknown_rows,
+            numeric_features,
+            np.asarray(numeric_slots),
+            np.asarray(scale),
+            np.asarray(offset),
+        )
+        plan.check_parity(loaded_components, categories)
+        return plan
+
+    def encode_row(self, inputs: dict) -> np.ndarray:
+        """Build the ``1 x len(selected_features)`` vector for one customer.
+
+        Raises ``KeyError`` for values outside the compiled categories.
+        """
+        rows = []
+        for feature in self.categorical_features:
+            row = self.lookups[feature].get(str(inputs[feature]))
+            if row is None:
+                row = self.unknown_rows[feature]
+                if row is None:
+                    raise KeyError(feature)
+            rows.append(self.row_offsets[feature] + row)
+        vector = self.base + self.table[rows].sum(axis=0)
+        numeric = np.array([float(inputs[f]) for f in self.numeric_features])
+        vector[self.numeric_slots] = numeric * self.scale + self.offset
+        return vector.reshape(1, -1)
+
+    def encode_frame(self, frame: pd.DataFrame) -> np.ndarray:
+        """Vectorized ``encode_row`` over a normalized batch frame.
+
+        Each categorical column costs one index lookup and one table gather.
+        """
+        vectors = np.tile(self.base, (len(frame), 1))
+        for feature in self.categorical_features:
+            codes = self.indexes[feature].get_indexer(frame[feature].astype(str))
+            unknown = codes < 0
+            if unknown.any():
+                if self.unknown_rows[feature] is None:
+                    raise KeyError(feature)
+                codes[unknown] = self.unknown_rows[feature]
+            vectors += self.tables[feature][codes]
+
+        numeric = frame[self.numeric_features].to_numpy(dtype="float64")
+        vectors[:, self.numeric_slots] = numeric * self.scale + self.offset
+        return vectors
+
+    def check_parity(self, loaded_components: dict, categories: dict, rounds=64):
+        # compare against the pandas path on random profiles before use
+        rng = np.random.default_rng(0)
+        profiles = []
+        for _ in range(rounds):
+            profile = {f: rng.choice(categories[f]) for f in categories}
+            profile.update(
+                {f: str(round(rng.uniform(0, 200), 2)) for f in self.numeric_features}
+            )
+            profiles.append(profile)
+
+        expected = _reference_vectors(loaded_components, profiles)
+        actual = np.vstack([self.encode_row(profile) for profile in profiles])
+        batch = self.encode_frame(pd.DataFrame(profiles))
+        if not (np.allclose(actual, expected) and np.allclose(batch, expected)):
+            raise PlanCompileError("Compiled plan does not match the pandas path")
+
+
+def _probe_unknown(
+    loaded_components: dict,
+    base_row: dict,
+    base: np.ndarray,
+    feature_slots: Dict[str, np.ndarray],
+    tables: Dict[str, np.ndarray],
+) -> Dict[str, Optional[int]]:
+    # append each feature's encoding of an unseen value as a fallback row
+    unknown_rows = {feature: None for feature in feature_slots}
+    probes = [{**base_row, f: UNKNOWN_CATEGORY} for f in feature_slots]
+    try:
+        encoded = _reference_vectors(loaded_components, probes)
+    except (ValueError, PlanCompileError):
+        return unknown_rows  # encoder rejects unseen values
+
+    for (feature, slots), vector in zip(feature_slots.items(), encoded):
+        if (vector != base)[~slots].any():
+            continue  # unseen value leaks into other columns, no safe fallback
+        unknown_rows[feature] = len(tables[feature])
+        tables[feature] = np.vstack([tables[feature], np.where(slots, vector, 0.0)])
+
+    return unknown_rows
+
+
+def _reference_vectors(loaded_components: dict, rows: List[dict]) -> np.ndarray:
+    features = loaded_components["reference_features"]
+    frame = pd.DataFrame([[row[f] for f in features] for row in rows], columns=features)
+    prepared = transform_features(loaded_components, frame)
+    try:
+        return prepared.to_numpy(dtype="float64")
+    except (TypeError, ValueError):
+        raise PlanCompileError("Preprocessed features are not numeric")
+
+
+def compile_plan(loaded_components: dict) -> Optional[InferencePlan]:
+    """Compile an ``InferencePlan``, or return None to keep the pandas path."""
+    try:
+        return InferencePlan.compile(loaded_components)
+    except PlanCompileError:
+        return None
+
+
+def predict_row(
+    loaded_components: dict, plan: InferencePlan, inputs: dict
+) -> Tuple[str, np.ndarray]:
+    classifier = get_classifier(loaded_components, inputs["selected_model"])
+    proba = classifier.predict_proba(plan.encode_row(inputs))
+    return classifier.classes_[proba.argmax(axis=1)], proba
+
+
+class PredictionCache(ResultCache):
+    """Bounded, thread-safe LRU of prediction results shared by all sessions.
+
+    Keys combine the canonical customer features with the model name and the
+    artifact hash, so a newly loaded artifact never serves stale results.
+    """
+
+    def invalidate(self, keep_sha256: Optional[str] = None):
+        """Drop every entry, or only those built from other artifacts."""
+        if keep_sha256 is None:
+            super().invalidate()
+        else:
+            super().invalidate(keep=lambda key: key[-1] == keep_sha256)
+
+
+prediction_cache = PredictionCache()
+
+
+def prediction_key(inputs: dict, features: List[str], sha256: str) -> tuple:
+    # numbers are rounded to cents so 50 and 50.0 map to the same profile
+    values = tuple(
+        (
+            round(float(inputs[f]), 2)
+            if f in NUMERICAL_FEATURES
+            else str(inputs[f]).strip()
+        )
+        for f in features
+    )
+    return values, inputs["selected_model"], sha256
+
+
+def benchmark(
+    loaded_components: dict,
+    plan: InferencePlan,
+    inputs: dict,
+    rounds: int = 200,
+) -> Dict[str, float]:
+    """Median single-row latency in microseconds for each inference path."""
+    features = loaded_components["reference_features"]
+    classifier = get_classifier(loaded_components, inputs["selected_model"])
+    vector = plan.encode_row(inputs)
+
+    def pandas_path():
+        frame = pd.DataFrame(
+            np.array([inputs[f] for f in features]).reshape(1, -1), columns=features
+        )
+        classifier.predict_proba(transform_features(loaded_components, frame))
+
+    paths = {
+        "pandas": pandas_path,
+        "compiled": lambda: predict_row(loaded_components, plan, inputs),
+        "classifier_only": lambda: classifier.predict_proba(vector),
+    }
+    timings = {}
+    for name, path in paths.items():
+        samples = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            path()
+            samples.append(time.perf_counter() - start)
+        timings[name] = float(np.median(samples) * 1e6)
+
+    return timings
+
+
+def read_upload(uploaded_file) -> pd.DataFrame:
+    if uploaded_file.name.lower().endswith(".parquet"):
+        return pd.read_parquet(uploaded_file)
+    return pd.read_csv(uploaded_file)
+
+
+if __name__ == "__main__":
+    # parity and latency check: python inference.py path/to/ml.pkl
+    import pickle
+    import sys
+
+    with open(sys.argv[1], "rb") as file:
+        components = pickle.load(file)
+
+    compiled = InferencePlan.compile(components)  # raises if parity fails
+    profile = {f: options[0] for f, options in CATEGORY_OPTIONS.items()}
+    profile.update({"tenure": 12, "MonthlyCharges": 70.0, "TotalCharges": 840.0})
+    for model in MODEL_KEYS:
+        results = benchmark(components, compiled, {**profile, "selected_model": model})
+        print(model, {name: f"{us:.0f} us" for name, us in results.items()})
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import time
+from datetime import datetime
+from typing import Optional, Tuple
+
+import requests
+
+
+ARTIFACT_URL = "https://github.com/modelMaestroSolo/Customer_churn_classification/raw/main/export/ml.pkl"
+
+# where downloaded artifacts are kept, one file per content hash
+MODEL_DIR = os.environ.get("CHURN_MODEL_DIR", "./models")
+MANIFEST_NAME = "manifest.json"
+
+# offline mode: load this local pickle and never touch the network
+OFFLINE_PATH = os.environ.get("CHURN_MODEL_PATH")
+
+# optional pin, artifacts whose hash differs are rejected
+EXPECTED_SHA256 = os.environ.get("CHURN_MODEL_SHA256")
+
+DOWNLOAD_TIMEOUT = 30
+
+
+class ArtifactError(RuntimeError):
+    """Raised when no verified model artifact can be loaded."""
+
+
+def sha256_digest(payload: bytes) -> str:
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _atomic_write(path: str, payload: bytes):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _manifest_path(model_dir: str) -> str:
+    return os.path.join(model_dir, MANIFEST_NAME)
+
+
+def read_manifest(model_dir: str = MODEL_DIR) -> Optional[dict]:
+    try:
+        with open(_manifest_path(model_dir)) as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _verify(payload: bytes, expected: Optional[str], origin: str) -> str:
+    digest = sha256_digest(payload)
+    if expected and digest != expected:
+        raise ArtifactError(
+            f"Integrity check failed for {origin}: expected {expected[:12]}, got {digest[:12]}"
+        )
+    if EXPECTED_SHA256 and digest != EXPECTED_SHA256:
+        raise ArtifactError(
+            f"Model artifact {digest[:12]} does not match the pinned CHURN_MODEL_SHA256"
+        )
+    return digest
+
+
+def download_artifact(url: str = ARTIFACT_URL, model_dir: str = MODEL_DIR) -> str:
+    """Download the artifact, store it under its content hash and return the hash."""
+    try:
+        response = requests.get(url, timeout=DOWNLOAD_TIMEOUT)
+        response.raise_for_status()
+    except requests.RequestException as error:
+        raise ArtifactError(f"Failed to download the serialized model: {error}")
+
+    payload = response.content
+    digest = _verify(payload, None, url)
+    _atomic_write(os.path.join(model_dir, f"{digest}.pkl"), payload)
+
+    manifest = {
+        "sha256": digest,
+        "url": url,
+        "size_bytes": len(payload),
+        "downloaded_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    _atomic_write(_manifest_path(model_dir), json.dumps(manifest, indent=2).encode())
+
+    return digest
+
+
+def _read_cached(model_dir: str) -> Optional[Tuple[bytes, str]]:
+    manifest = read_manifest(model_dir)
+    if manifest is None:
+        return None
+
+    path = os.path.join(model_dir, f"{manifest['sha256']}.pkl")
+    try:
+        with open(path, "rb") as file:
+            payload = file.read()
+    except FileNotFoundError:
+        return None
+
+    return payload, _verify(payload, manifest["sha256"], path)
+
+
+def load_model_components(
+    refresh: bool = False,
+    offline_path: Optional[str] = OFFLINE_PATH,
+    url: str = ARTIFACT_URL,
+    model_dir: str = MODEL_DIR,
+) -> Tuple[dict, dict]:
+    """Load the model components, serving from the local store first.
+
+    The network is only used when the store is empty or ``refresh`` is set.
+    With ``offline_path`` the given pickle is loaded and nothing is downloaded.
+
+    :return: the unpickled components and a load report with the source,
+        content hash and cold load time in seconds
+    """
+    start = time.perf_counter()
+
+    if offline_path:
+        try:
+            with open(offline_path, "rb") as file:
+                payload = file.read()
+        except OSError as error:
+            raise ArtifactError(f"Offline model artifact not readable: {error}")
+        digest = _verify(payload, None, offline_path)
+        source = "offline"
+    else:
+        cached = None
+        try:
+            cached = None if refresh else _read_cached(model_dir)
+        except ArtifactError:
+            # corrupted file on disk, fetch a fresh copy below
+            cached = None
+
+        if cached is not None:
+            payload, digest = cached
+            source = "disk"
+        else:
+            try:
+                download_artifact(url=url, model_dir=model_dir)
+                source = "network"
+            except ArtifactError:
+                if not refresh:
+                    raise
+                source = "disk"  # refresh failed, keep serving the stored copy
+            cached = _read_cached(model_dir)
+            if cached is None:
+                raise ArtifactError("No model artifact available on disk or network.")
+            payload, digest = cached
+
+    loaded_components = pickle.loads(payload)
+
+    report = {
+        "source": source,
+        "sha256": digest,
+        "size_bytes": len(payload),
+        "cold_load_seconds": time.perf_counter() - start,
+    }
+    return loaded_components, report
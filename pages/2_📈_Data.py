@@ -1,11 +1,9 @@
 import streamlit as st
 
 # import pyodbc
-import pandas as pd
-import numpy as np
-import requests
 from typing import List, Tuple, Union
 from utils import login
+from dataset import get_dataset, rebuild_dataset
 
 
 ## set page configuration, title and description
@@ -71,68 +69,9 @@ def display_title():
 #     return df_database
 
 
-@st.cache_data(show_spinner="Pulling Data from Github...")
-def get_github_data(url):
-    """This function gets data from github repo and coverts it to a datafraome
-
-    :param url: github link to the source data
-    :type url: link
-    """
-    # make request
-    response = requests.get(url)
-
-    # check if download was successful
-    if response.status_code == 200:
-
-        data_github = (
-            response.json()
-        )  # deserialize JSON string received from the HTTP response
-        data_github = data_github["payload"]["blob"][
-            "csv"
-        ]  # access main data from csv key
-
-        df = pd.DataFrame(data_github[1:], columns=data_github[0])
-    else:
-        st.error("Failed to download data from Github")
-
-    return df
-
-
-@st.cache_data(show_spinner="Cleaning Retrieved Data...")
-def clean_data(data_db, data_github):
-
-    dtypes = {"tenure": "int32", "MonthlyCharges": "float64", "TotalCharges": "float64"}
-
-    smart_features = [
-        "OnlineSecurity",
-        "OnlineBackup",
-        "DeviceProtection",
-        "TechSupport",
-        "StreamingTV",
-        "StreamingMovies",
-    ]
-    data_db[smart_features] = data_db[smart_features].fillna("No internet service")
-    data_db["MultipleLines"] = data_db["MultipleLines"].fillna("No phone service")
-    data_db["TotalCharges"] = data_db["TotalCharges"].fillna(
-        data_db["TotalCharges"].mean()
-    )
-    data_db = data_db.dropna(subset=["Churn"])
-    data_db = data_db.replace({True: "Yes", False: "No"})
-
-    data_github["SeniorCitizen"] = data_github["SeniorCitizen"].replace(
-        {1: "Yes", 0: "No"}
-    )
-
-    cleaned_data = pd.concat([data_db, data_github], axis=0).reset_index(drop=True)
-
-    cleaned_data["TotalCharges"] = cleaned_data["TotalCharges"].replace({" ": np.nan})
-    cleaned_data = cleaned_data.astype(dtypes)
-    cleaned_data["TotalCharges"] = cleaned_data["TotalCharges"].fillna(
-        cleaned_data["TotalCharges"].median()
-    )
-    cleaned_data["Churn"] = cleaned_data["Churn"].astype("category")
-
-    return cleaned_data
+def display_rebuild_button():
+    if st.sidebar.button("Rebuild Data", help="Re-clean every source from scratch"):
+        rebuild_dataset()
 
 
 def main():
@@ -144,18 +83,10 @@ def main():
     # )
 
     # df_database = create_dataframe_db(rows=rows, description=description)
-    df_database = pd.read_csv("./data/Telco-churn-first-3000.csv")
-    url_github = (
-        "https://github.com/Azubi-Africa/Career_Accelerator_LP2-Classifcation/"
-        + "blob/main/LP2_Telco-churn-second-2000.csv"
-    )
+    display_rebuild_button()  # runs before loading so a rebuild takes effect now
 
-    df_github = get_github_data(url=url_github)
-
-    cleaned_data = clean_data(data_db=df_database, data_github=df_github)
-    st.session_state["df"] = (
-        cleaned_data  # helps to pass cleaned data to dashbaord page
-    )
+    dataset = get_dataset()  # shared by all sessions and the dashboard
+    cleaned_data = dataset.frame
 
     tab1, tab2, tab3 = st.tabs(
         ["Data Preview", "Data Surface Properties", "Feature Description"]
@@ -196,6 +127,21 @@ def main():
 
     with tab2:
         st.markdown("**Data Set Name:** Telco Churn Dataset")
+        memory, reduction = st.columns(2)
+        saved_mb = (dataset.bytes_before - dataset.bytes_after) / 1e6
+        ratio = dataset.bytes_before / max(dataset.bytes_after, 1)
+        memory.metric(
+            "Memory Footprint",
+            f"{dataset.bytes_after / 1e6:.2f} MB",
+            delta=f"-{saved_mb:.2f} MB",
+            delta_color="inverse",
+        )
+        reduction.metric(
+            "Before Compaction",
+            f"{dataset.bytes_before / 1e6:.2f} MB",
+            delta=f"{ratio:.1f}x smaller now",
+            delta_color="off",
+        )
         st.markdown(
             "**Abstract:**  The dataset contains comprehensive information about the characteristics and behaviours of customers, including details about whether or not they churn."
         )
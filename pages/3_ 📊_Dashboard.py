@@ -1,8 +1,32 @@
+import json
+import os
+import time
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
-from typing import List, Tuple
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from typing import Callable, List, Optional, Tuple
 from utils import login
+from dataset import get_dataset
+from result_cache import ResultCache
+from streaming_stats import Summary
+from query_backend import ArrowBackend
+from analytics import (
+    DIMENSIONS,
+    MEASURES,
+    Cube,
+    FilterIndex,
+    TopIndex,
+    bin_edges,
+    box_stats,
+    filter_key,
+    gather,
+    histogram,
+    histogram2d,
+    stratified_sample,
+)
 
 
 # function to set up page configuration
@@ -24,16 +48,141 @@ def display_title():
     st.markdown("<style> footer {visibility: hidden;} </style>", unsafe_allow_html=True)
 
 
-# func to access data from session state
+ROW_COLUMNS = ["customerID", "Churn"] + MEASURES
 
+# number of bins per histogram
+HISTOGRAM_BINS = {"tenure": 35, "MonthlyCharges": 30, "TotalCharges": 80}
 
-def access_data():
-    if "df" not in st.session_state:
-        st.info("Visit the Data page to automatically load data for the dashbaord!")
-        st.stop()
-    else:
-        cleaned_data = st.session_state["df"]
-    return cleaned_data
+# above this many filtered rows the pair plot is sampled or drawn as densities
+PAIRPLOT_MAX_POINTS = int(os.environ.get("CHURN_PAIRPLOT_MAX_POINTS", 5000))
+PAIRPLOT_BINS = 40
+
+MAX_TOP_N = 100
+
+# "arrow" reads the row-level views from a partitioned Parquet copy with the
+# filters pushed down; "memory" slices the shared in-memory frame
+BACKEND = os.environ.get("CHURN_DASHBOARD_BACKEND", "memory")
+
+# figures and results kept per (dataset version, filter selection, section)
+FIGURE_CACHE_SIZE = int(os.environ.get("CHURN_FIGURE_CACHE_SIZE", 512))
+
+
+# func to access the dataset shared by all sessions, loaded on first use
+
+
+def access_data() -> Tuple[pd.DataFrame, str]:
+    dataset = get_dataset()
+    return dataset.frame, dataset.version
+
+
+# the cube is built once per dataset version and shared by all sessions
+@st.cache_resource(show_spinner="Aggregating Data...", max_entries=2)
+def get_cube(_data: pd.DataFrame, version: str) -> Cube:
+    return Cube(_data)
+
+
+# filter masks are built once per dataset version and shared by all sessions
+@st.cache_resource(show_spinner="Indexing Data...", max_entries=2)
+def get_filter_index(_data: pd.DataFrame, version: str) -> FilterIndex:
+    return FilterIndex(_data)
+
+
+# per-measure sort orders for the top customer tables
+@st.cache_resource(show_spinner="Indexing Data...", max_entries=2)
+def get_top_index(_data: pd.DataFrame, version: str) -> TopIndex:
+    return TopIndex(_data)
+
+
+# streaming summaries of the measures per cube cell, merged per selection
+@st.cache_resource(show_spinner="Summarizing Data...", max_entries=2)
+def get_cell_summaries(_data: pd.DataFrame, version: str) -> dict:
+    return {
+        cell: Summary.from_chunks([rows], MEASURES)
+        for cell, rows in _data[DIMENSIONS + MEASURES].groupby(
+            DIMENSIONS, observed=True
+        )
+    }
+
+
+# the partitioned copy is written once per dataset version
+@st.cache_resource(show_spinner="Partitioning Data...", max_entries=1)
+def get_arrow_backend(_data: pd.DataFrame, version: str) -> ArrowBackend:
+    return ArrowBackend.build(_data, version)
+
+
+def arrow_backend(data: pd.DataFrame, version: str) -> ArrowBackend:
+    backend = get_arrow_backend(data, version)
+    # "Rebuild Data" clears data/cache, taking the partitioned copy with it
+    if not os.path.isdir(backend.path):
+        get_arrow_backend.clear()
+        backend = get_arrow_backend(data, version)
+    return backend
+
+
+def display_scan_report(data: pd.DataFrame, version: str, filters: dict, key: tuple):
+    scanned, total = cached(
+        key,
+        "scan",
+        lambda: arrow_backend(data, version).scan_bytes(ROW_COLUMNS, filters),
+    )
+    with st.sidebar.expander("Arrow Backend"):
+        st.write(
+            f"Read {scanned / 1e6:.2f} of {total / 1e6:.2f} MB "
+            f"({scanned / total if total else 0:.0%}) for the selected filters"
+        )
+
+
+# bin edges come from the full dataset so they do not move with the filters
+@st.cache_resource(max_entries=2)
+def get_bin_edges(_data: pd.DataFrame, version: str) -> dict:
+    return {
+        measure: bin_edges(_data[measure], nbins)
+        for measure, nbins in HISTOGRAM_BINS.items()
+    }
+
+
+# one LRU of figures and results shared by all sessions. Keys start with the
+# dataset version and the canonical filter selection, so a common selection
+# (e.g. everything selected) is only computed once per dataset version
+@st.cache_resource
+def get_figure_cache() -> ResultCache:
+    return ResultCache(maxsize=FIGURE_CACHE_SIZE)
+
+
+def cached(key: tuple, section: str, build: Callable[[], object]):
+    return get_figure_cache().get_or_build(key + (section,), build)
+
+
+# sections rerun on their own when their widgets change; fragments need
+# Streamlit >= 1.33, older versions fall back to rerunning the whole page
+fragment = getattr(st, "fragment", None) or getattr(
+    st, "experimental_fragment", lambda func: func
+)
+
+
+@fragment
+def render_section(section: str, display: Callable, **kwargs):
+    start = time.perf_counter()
+    display(**kwargs)
+    st.session_state.setdefault("render_times", {})[section] = (
+        time.perf_counter() - start
+    )
+
+
+def display_render_times():
+    render_times = st.session_state.get("render_times", {})
+    with st.sidebar.expander("Render Times"):
+        for section, seconds in render_times.items():
+            st.write(f"{section}: {seconds * 1000:.1f} ms")
+
+
+def display_cache_stats():
+    stats = get_figure_cache().stats()
+    with st.sidebar.expander("Figure Cache"):
+        st.write(
+            f"{stats['size']} entries, {stats['hit_rate']:.0%} hit rate "
+            f"({stats['hits']} hits, {stats['misses']} misses)"
+        )
 
 
 # define function for filters input widget. values to be used for filtering data
@@ -71,87 +220,101 @@ def display_sidebar(data: pd.DataFrame) -> Tuple[List[str], List[str], List[str]
     )
 
 
-# define function to filter data
-def filter_data(data: pd.DataFrame, column: str, values: List[str]):
-    return data[data[column].isin(values)] if values else data
-
-
 ### EXPLORATORY DATA ANALYSIS DASHBOARD
 
 
-# define function for histograms and distribution plots
-def display_hist(data: pd.DataFrame):
+# define function for histograms and distribution plots, from binned counts
+def display_hist(load: Callable[[], pd.DataFrame], edges: dict, key: tuple):
 
     st.subheader("Histogram Plots")
+    for fig in cached(key, "hist", lambda: histogram_figures(load(), edges)):
+        st.plotly_chart(fig)
+
+
+def histogram_figures(data: pd.DataFrame, edges: dict) -> list:
     w = 450
     h = 400
-    fig1 = px.histogram(
-        data,
-        x="tenure",
-        nbins=35,
-        color="Churn",
-        title="Distribution of Tenure by Churn Status",
-        width=w,
-        height=h,
-    )
-    st.plotly_chart(fig1)
+    titles = {
+        "tenure": "Distribution of Tenure by Churn Status",
+        "MonthlyCharges": "Distribution of Monthly Charges by Churn Status",
+        "TotalCharges": "Distribution of Total Charges by Churn Status",
+    }
+    figs = []
+    for measure, measure_edges in edges.items():
+        binned = histogram(data, measure, measure_edges)
+        fig = px.bar(
+            binned.assign(center=(binned["left"] + binned["right"]) / 2),
+            x="center",
+            y="count",
+            color="Churn",
+            hover_data=["left", "right"],
+            labels={"center": measure},
+            title=titles[measure],
+            width=w,
+            height=h,
+        )
+        fig.update_traces(width=float((binned["right"] - binned["left"]).max()))
+        fig.update_layout(bargap=0)
+        figs.append(fig)
+    return figs
 
-    fig2 = px.histogram(
-        data,
-        x="MonthlyCharges",
-        nbins=30,
-        color="Churn",
-        title="Distribution of Monthly Charges by Churn Status",
-        width=w,
-        height=h,
-    )
-    st.plotly_chart(fig2)
 
-    fig3 = px.histogram(
-        data,
-        x="TotalCharges",
-        nbins=80,
-        color="Churn",
-        title="Distribution of Total Charges by Churn Status",
-        width=w,
-        height=h,
-    )
-    st.plotly_chart(fig3)
+def display_boxplot(load: Callable[[], pd.DataFrame], key: tuple):
 
+    st.subheader("Box Plots")
+    for fig in cached(key, "box", lambda: boxplot_figures(load())):
+        st.plotly_chart(fig)
 
-def display_boxplot(data: pd.DataFrame):
 
-    st.subheader("Box Plots")
+def boxplot_figures(data: pd.DataFrame) -> list:
     w = 450
     h = 400
-    cols = ["tenure", "MonthlyCharges", "TotalCharges"]
-
-    # Create an empty list to store the box plot figures
-    boxplot_figs = []
-
-    # Iterate over each numerical column
-    for num_var in cols:
-        # Create a box plot figure using Plotly Express
-        fig = px.box(
-            data,
-            x="Churn",
-            y=num_var,
+
+    # draw each box from precomputed statistics, plus the sampled outliers
+    figs = []
+    for num_var in MEASURES:
+        stats, outliers = box_stats(data, num_var)
+        fig = go.Figure(
+            [
+                go.Box(
+                    x=stats["Churn"],
+                    q1=stats["q1"],
+                    median=stats["median"],
+                    q3=stats["q3"],
+                    lowerfence=stats["lowerfence"],
+                    upperfence=stats["upperfence"],
+                    mean=stats["mean"],
+                    name=num_var,
+                    marker_color=px.colors.qualitative.Plotly[0],
+                ),
+                go.Scatter(
+                    x=outliers["Churn"],
+                    y=outliers[num_var],
+                    mode="markers",
+                    name="outliers",
+                    marker_color=px.colors.qualitative.Plotly[0],
+                ),
+            ]
+        )
+        fig.update_layout(
             title=f"Boxplot of {num_var}",
+            xaxis_title="Churn",
+            yaxis_title=num_var,
+            showlegend=False,
             width=w,
             height=h,
         )
+        figs.append(fig)
+    return figs
 
-        # Append the figure to the list
-        boxplot_figs.append(fig)
 
-    # Display the box plot figures using Streamlit
-    for fig in boxplot_figs:
-        st.plotly_chart(fig)
-
-
-def display_corr_heatmap(data: pd.DataFrame):
+def display_corr_heatmap(load: Callable[[], pd.DataFrame], key: tuple):
     # Correlation Heatmap
     st.subheader("Correlation Heatmap")
+    st.plotly_chart(cached(key, "corr", lambda: corr_heatmap_figure(load())))
+
+
+def corr_heatmap_figure(data: pd.DataFrame) -> go.Figure:
     correlation_matrix = data[["tenure", "MonthlyCharges", "TotalCharges"]].corr()
     fig = px.imshow(
         correlation_matrix,
@@ -163,50 +326,117 @@ def display_corr_heatmap(data: pd.DataFrame):
     # Update the y-axis tick orientation
     fig.update_yaxes(tickangle=75)
     fig.update_xaxes(tickangle=0)
-    st.plotly_chart(fig)
+    return fig
 
 
 # define pair plot function
-def display_pairplot(data: pd.DataFrame):
+def display_pairplot(load: Callable[[], pd.DataFrame], size: int, key: tuple):
     # Pair Plots
     st.subheader("Pair Plots")
+    mode = "Points"
+    if size > PAIRPLOT_MAX_POINTS:
+        mode = st.radio(
+            "Pair plot mode",
+            options=["Sample", "Density"],
+            horizontal=True,
+            label_visibility="collapsed",
+        )
+
+    if mode == "Density":
+        st.plotly_chart(
+            cached(key, "pair:density", lambda: pair_density_figure(load()))
+        )
+        return
+
+    if mode == "Sample":
+        st.caption(f"Stratified sample of {PAIRPLOT_MAX_POINTS:,} customers")
+
+    sample = mode == "Sample"
+    st.plotly_chart(
+        cached(key, f"pair:{mode}", lambda: pairplot_figure(load(), sample))
+    )
+
+
+def pairplot_figure(data: pd.DataFrame, sample: bool) -> go.Figure:
+    if sample:
+        data = stratified_sample(data[["Churn"] + MEASURES], PAIRPLOT_MAX_POINTS)
+
+    # scatter_matrix draws a WebGL splom trace
     fig8 = px.scatter_matrix(
         data,
-        dimensions=["tenure", "MonthlyCharges", "TotalCharges"],
+        dimensions=MEASURES,
         color="Churn",
         width=450,
         height=400,
     )
-    st.plotly_chart(fig8)
+    fig8.update_traces(marker_size=3)
+    return fig8
+
+
+def pair_density_figure(data: pd.DataFrame) -> go.Figure:
+    edges = {measure: bin_edges(data[measure], PAIRPLOT_BINS) for measure in MEASURES}
+    fig = make_subplots(rows=len(MEASURES), cols=len(MEASURES))
+    for row, y in enumerate(MEASURES, start=1):
+        for col, x in enumerate(MEASURES, start=1):
+            counts = histogram2d(data, x, y, edges[x], edges[y])
+            centers = (edges[x][:-1] + edges[x][1:]) / 2
+            if x == y:
+                trace = go.Bar(x=centers, y=counts.sum(axis=0))
+            else:
+                trace = go.Heatmap(
+                    x=centers,
+                    y=(edges[y][:-1] + edges[y][1:]) / 2,
+                    z=counts,
+                    colorscale="Viridis",
+                    showscale=False,
+                )
+            fig.add_trace(trace, row=row, col=col)
+            if row == len(MEASURES):
+                fig.update_xaxes(title_text=x, row=row, col=col)
+            if col == 1:
+                fig.update_yaxes(title_text=y, row=row, col=col)
+
+    fig.update_layout(showlegend=False, bargap=0, width=450, height=400)
+    return fig
 
 
 # define function to display pie charts
-def display_pie(data: pd.DataFrame):
+def display_pie(cube: Cube, cells: pd.DataFrame, key: tuple):
 
     # Pie Charts
     st.subheader("Pie Chart")
-    fig = px.pie(
-        data,
-        hole=0.5,
-        names="Churn",
-        title="Proportion of Churned vs. Non-Churned Customers",
-        width=350,
-        height=400,
+    fig = cached(
+        key,
+        "pie",
+        lambda: px.pie(
+            cube.counts_by(cells, "Churn"),
+            hole=0.5,
+            names="Churn",
+            values="count",
+            title="Proportion of Churned vs. Non-Churned Customers",
+            width=350,
+            height=400,
+        ),
     )
     st.plotly_chart(fig)
 
 
-def display_barchart_PaymentMethod(data: pd.DataFrame):
+def display_barchart_PaymentMethod(cube: Cube, cells: pd.DataFrame, key: tuple):
 
     # Pie Charts
     st.subheader("Barplot")
-    fig = px.bar(
-        data,
-        x="PaymentMethod",
-        color="Churn",
-        title="Barplot of Payment Methods",
-        width=350,
-        height=450,
+    fig = cached(
+        key,
+        "bar:PaymentMethod",
+        lambda: px.bar(
+            cube.counts_by(cells, "PaymentMethod"),
+            x="PaymentMethod",
+            y="count",
+            color="Churn",
+            title="Barplot of Payment Methods",
+            width=350,
+            height=450,
+        ),
     )
 
     st.plotly_chart(fig)
@@ -214,71 +444,100 @@ def display_barchart_PaymentMethod(data: pd.DataFrame):
     # # Add more pie charts for other categorical variables...
 
 
-def display_barchart_IS_Contract(data: pd.DataFrame):
+def display_barchart_IS_Contract(cube: Cube, cells: pd.DataFrame, key: tuple):
     w, h = 450, 350
     internet, contract = st.columns(2)
     with internet:
         st.subheader("Barplot")
-        fig = px.bar(
-            data,
-            y="InternetService",
-            color="Churn",
-            title="Barplot of Internet Service",
-            width=w,
-            height=h,
+        fig = cached(
+            key,
+            "bar:InternetService",
+            lambda: px.bar(
+                cube.counts_by(cells, "InternetService"),
+                y="InternetService",
+                x="count",
+                color="Churn",
+                title="Barplot of Internet Service",
+                width=w,
+                height=h,
+            ),
         )
         st.plotly_chart(fig)
 
     with contract:
         st.subheader("Barplot")
-        fig = px.bar(
-            data,
-            y="Contract",
-            color="Churn",
-            title="Barplot of Contract",
-            width=w,
-            height=h,
+        fig = cached(
+            key,
+            "bar:Contract",
+            lambda: px.bar(
+                cube.counts_by(cells, "Contract"),
+                y="Contract",
+                x="count",
+                color="Churn",
+                title="Barplot of Contract",
+                width=w,
+                height=h,
+            ),
         )
         st.plotly_chart(fig)
 
 
-def display_summary_stats(data: pd.DataFrame, numerical: bool):
+def display_summary_stats(
+    numerical: bool,
+    key: tuple,
+    cube: Cube,
+    cells: pd.DataFrame,
+    summaries: dict = None,
+):
 
     if numerical:
         st.subheader("Summary statistics of numerical variables")
-        st.write(data.describe().round(1))
+        summary_stats = cached(
+            key,
+            "describe",
+            lambda: merge_summaries(summaries, cells).describe_numeric().round(1),
+        )
+        st.write(summary_stats)
     else:
         st.subheader("Summary statistics of selected categorical variables")
-        summary_stats = data[
-            ["Churn", "InternetService", "Contract", "PaymentMethod"]
-        ].describe()
+        summary_stats = cached(
+            key,
+            "describe:categorical",
+            lambda: cube.describe(
+                cells, ["Churn", "InternetService", "Contract", "PaymentMethod"]
+            ),
+        )
         st.write(summary_stats)
 
 
+# the summary of a selection is merged from the partial summaries of its cells
+def merge_summaries(summaries: dict, cells: pd.DataFrame) -> Summary:
+    summary = Summary(MEASURES)
+    for cell in cells[DIMENSIONS].itertuples(index=False, name=None):
+        summary.merge(summaries[cell])
+    return summary
+
+
 ### KPI DASHBOARD
 
 
-# define function to calculate and return kpis values
-def calculate_kpis(filtered_data: pd.DataFrame, full_data: pd.DataFrame) -> List[float]:
+# define function to format the kpi values computed by the cube for display
+def format_kpis(values: dict) -> Tuple[List[str], List[str]]:
 
     # overall kpis
-    total_active_customers = f"{(full_data['Churn'] == 'No').sum() / 1000:.2f}K"
-    total_churned_customers = (full_data["Churn"] == "Yes").sum()
-    overall_churn_rate = (
-        f'{full_data["Churn"].value_counts(normalize=True)["Yes"] * 100:.2f}%'
-    )
-    overall_total_charges = f"{ full_data['TotalCharges'].sum() / 1000000:.2f}M"
-
-    # filtered kpis: numeric
-    if (filtered_data["Churn"].isin(["Yes"])).sum() > 1:
-        churn_rate = (
-            f'{filtered_data["Churn"].value_counts(normalize=True)["Yes"] * 100:.2f}%'
-        )
+    total_active_customers = f"{values['active_customers'] / 1000:.2f}K"
+    total_churned_customers = values["churned_customers"]
+    overall_churn_rate = f"{values['churn_rate'] * 100:.2f}%"
+    overall_total_charges = f"{values['total_charges'] / 1000000:.2f}M"
+
+    # filtered kpis
+    if values["filtered_customers"]:
+        churn_rate = f"{values['filtered_churn_rate'] * 100:.2f}%"
     else:
         churn_rate = f"{0.00}%"
-    average_tenure = round(filtered_data["tenure"].mean(), 2)
-    average_monthly_charges = round(filtered_data["MonthlyCharges"].mean(), 2)
-    average_total_charges = f"{filtered_data['TotalCharges'].mean() / 1000:.2f}K"
+    average_tenure = round(values["filtered_avg_tenure"], 2)
+    average_monthly_charges = round(values["filtered_avg_MonthlyCharges"], 2)
+    average_total_charges = f"{values['filtered_avg_TotalCharges'] / 1000:.2f}K"
 
     kpis = [
         total_active_customers,
@@ -318,45 +577,88 @@ def display_kpi(kpis: List[float], kpi_names: List[str]):
         col2[i].metric(label=kpi_names[i + 4], value=kpis[i + 4])
 
 
-def display_data_table(data: pd.DataFrame):
+def display_kpis(cube: Cube, filters: dict, key: tuple):
+    # values are cached as plain numbers; formatting happens on every render
+    values = cached(key, "kpis", lambda: cube.kpis(filters))
+    kpis, kpi_names = format_kpis(values)
+    display_kpi(kpis=kpis, kpi_names=kpi_names)
+
+    st.download_button(
+        "Export KPIs",
+        data=json.dumps(
+            {name: None if pd.isna(value) else value for name, value in values.items()},
+            indent=2,
+        ),
+        file_name="churn_kpis.json",
+        mime="application/json",
+    )
 
-    st.subheader("Top 10 Customers by:")
-    table1, table2, table3 = st.columns(3)
-    with table1:
-        st.subheader("Tenure")
-        top_custombers_tenure = (
-            data[["customerID", "tenure"]]
-            .nlargest(10, columns="tenure")
-            .round(1)
-            .reset_index(drop=True)
-        )
-        st.write(top_custombers_tenure)
-
-    with table2:
-        st.subheader("Monthly Charges")
-        top_customers_monthlyCharges = (
-            data[["customerID", "MonthlyCharges"]]
-            .nlargest(10, columns="MonthlyCharges")
-            .round(1)
-            .reset_index(drop=True)
-        )
-        st.write(top_customers_monthlyCharges)
-
-    with table3:
-        st.subheader("Total Charges")
-        top_customers_totalCharges = (
-            data[["customerID", "TotalCharges"]]
-            .nlargest(10, columns="TotalCharges")
-            .round(1)
-            .reset_index(drop=True)
-        )
-        st.write(top_customers_totalCharges)
+
+def display_data_table(
+    data: pd.DataFrame,
+    top_index: TopIndex,
+    mask: Optional[np.ndarray],
+    segment_masks: dict,
+    key: tuple,
+):
+
+    n_col, segment_col = st.columns(2)
+    n = n_col.number_input(
+        "Customers per table", min_value=1, max_value=MAX_TOP_N, value=10
+    )
+    segment = segment_col.selectbox("Leaderboards by", ["All customers"] + DIMENSIONS)
+    segments = segment_masks.get(segment, {"": None})
+
+    st.subheader(f"Top {n} Customers by:")
+    boards = cached(
+        key,
+        f"top:{n}:{segment}",
+        lambda: top_customers(data, top_index, n, mask, segments),
+    )
+    for label, tables in boards.items():
+        if label:
+            st.markdown(f"**{segment}: {label}**")
+        for column, title, measure in zip(
+            st.columns(3), ["Tenure", "Monthly Charges", "Total Charges"], MEASURES
+        ):
+            with column:
+                st.subheader(title)
+                st.write(tables[measure])
+
+
+# top rows come from the presorted index, so no table scans the selection
+def top_customers(
+    data: pd.DataFrame,
+    top_index: TopIndex,
+    n: int,
+    mask: Optional[np.ndarray],
+    segments: dict,
+) -> dict:
+    boards = {}
+    for label, segment_mask in segments.items():
+        # without a segment the tables follow the sidebar filters alone
+        if segment_mask is None:
+            segment_mask = mask
+        elif mask is not None:
+            segment_mask = segment_mask & mask
+        if segment_mask is not None and not segment_mask.any():
+            continue
+        tables = {}
+        for measure in MEASURES:
+            rows = top_index.top(measure, n, segment_mask)
+            top = data[["customerID", measure]].take(rows)
+            if pd.api.types.is_float_dtype(top[measure]):
+                top = top.astype({measure: "float64"})  # float32 would print unrounded
+            tables[measure] = top.round(1).reset_index(drop=True)
+        boards[label] = tables
+    return boards
 
 
 def main():
     display_title()
 
-    cleaned_data = access_data()  # access data from session state
+    cleaned_data, version = access_data()  # shared by all sessions, never modified
+    cube = get_cube(cleaned_data, version)
 
     (
         selected_churn,
@@ -365,68 +667,157 @@ def main():
         selected_payment_methods,
     ) = display_sidebar(data=cleaned_data)
 
-    filtered_data = cleaned_data.copy()
-    filtered_data = filter_data(
-        data=filtered_data, column="Churn", values=selected_churn
+    filters = {
+        "Churn": selected_churn,
+        "InternetService": selected_internet_services,
+        "Contract": selected_contracts,
+        "PaymentMethod": selected_payment_methods,
+    }
+    cells = cube.select(filters)
+    key = (version, filter_key(filters))
+
+    filter_index = get_filter_index(cleaned_data, version)
+    mask = filter_index.mask(filters)
+
+    # only the selected view is computed, unlike st.tabs which runs both
+    view = st.radio(
+        "View",
+        options=["Exploratory Analysis", "KPI Metrics"],
+        horizontal=True,
+        label_visibility="collapsed",
     )
-    filtered_data = filter_data(
-        data=filtered_data,
-        column="InternetService",
-        values=selected_internet_services,
-    )
-    filtered_data = filter_data(
-        data=filtered_data, column="Contract", values=selected_contracts
-    )
-    filtered_data = filter_data(
-        filtered_data, column="PaymentMethod", values=selected_payment_methods
-    )
-
-    tab1, tab2 = st.tabs(["Exploratory Analysis", "KPI Metrics"])
-
-    with tab1:
-        hist, box = st.columns(2)
-        with hist:
-            display_hist(data=filtered_data)
-
-        with box:
-            display_boxplot(data=filtered_data)
-
-        heatmap, pairplot = st.columns(2)
-
-        with heatmap:
-            display_corr_heatmap(data=filtered_data)
-        with pairplot:
-            display_pairplot(data=filtered_data)
-
-        pie, bar = st.columns(2)
-
-        with pie:
-            display_pie(data=filtered_data)
-
-        with bar:
-            display_barchart_PaymentMethod(data=filtered_data)
-
-        display_barchart_IS_Contract(data=filtered_data)
-
-        num_stats, cat_stats = st.columns(2)
+    st.session_state["render_times"] = {}
+
+    if view == "Exploratory Analysis":
+        edges = get_bin_edges(cleaned_data, version)
+        summaries = get_cell_summaries(cleaned_data, version)
+        load = row_loader(cleaned_data, version, filters, mask)
+        size = len(cleaned_data) if mask is None else int(mask.sum())
+        if BACKEND == "arrow":
+            display_scan_report(cleaned_data, version, filters, key)
+        display_eda(load, size, edges, summaries, cube, cells, key)
+    else:
+        top_index = get_top_index(cleaned_data, version)
+        display_kpi_metrics(
+            cleaned_data, cube, filters, top_index, mask, filter_index.masks, key
+        )
 
-        with num_stats:
-            display_summary_stats(filtered_data, numerical=True)
-        with cat_stats:
-            display_summary_stats(data=filtered_data, numerical=False)
+    display_render_times()
+    display_cache_stats()
+
+
+# row-level views only need the measures, Churn and the customer IDs. The rows
+# are read at most once per run, and only when a figure misses the cache
+def row_loader(
+    data: pd.DataFrame, version: str, filters: dict, mask: Optional[np.ndarray]
+) -> Callable[[], pd.DataFrame]:
+    loaded = []
+
+    def load() -> pd.DataFrame:
+        if not loaded:
+            if BACKEND == "arrow":
+                rows = arrow_backend(data, version).read(ROW_COLUMNS, filters)
+            else:
+                index = np.arange(len(data)) if mask is None else np.flatnonzero(mask)
+                rows = gather(data, index, ROW_COLUMNS)
+            loaded.append(rows)
+        return loaded[0]
+
+    return load
+
+
+def display_eda(
+    load: Callable[[], pd.DataFrame],
+    size: int,
+    edges: dict,
+    summaries: dict,
+    cube: Cube,
+    cells: pd.DataFrame,
+    key: tuple,
+):
+    hist, box = st.columns(2)
+    with hist:
+        render_section("Histograms", display_hist, load=load, edges=edges, key=key)
+
+    with box:
+        render_section("Box Plots", display_boxplot, load=load, key=key)
+
+    heatmap, pairplot = st.columns(2)
+
+    with heatmap:
+        render_section("Correlation Heatmap", display_corr_heatmap, load=load, key=key)
+    with pairplot:
+        render_section("Pair Plot", display_pairplot, load=load, size=size, key=key)
+
+    pie, bar = st.columns(2)
+
+    with pie:
+        render_section("Pie Chart", display_pie, cube=cube, cells=cells, key=key)
+
+    with bar:
+        render_section(
+            "Payment Method Bars",
+            display_barchart_PaymentMethod,
+            cube=cube,
+            cells=cells,
+            key=key,
+        )
 
-    with tab2:
-        st.subheader("Key Performance Indicators (KPIs)")
+    render_section(
+        "Service and Contract Bars",
+        display_barchart_IS_Contract,
+        cube=cube,
+        cells=cells,
+        key=key,
+    )
 
-        kpis, kpi_names = calculate_kpis(
-            filtered_data=filtered_data, full_data=cleaned_data
+    num_stats, cat_stats = st.columns(2)
+
+    with num_stats:
+        render_section(
+            "Numerical Summary",
+            display_summary_stats,
+            numerical=True,
+            key=key,
+            cube=cube,
+            cells=cells,
+            summaries=summaries,
+        )
+    with cat_stats:
+        render_section(
+            "Categorical Summary",
+            display_summary_stats,
+            numerical=False,
+            key=key,
+            cube=cube,
+            cells=cells,
         )
 
-        display_kpi(kpis=kpis, kpi_names=kpi_names)
-
-        st.divider()
 
-        display_data_table(data=filtered_data)
+def display_kpi_metrics(
+    cleaned_data: pd.DataFrame,
+    cube: Cube,
+    filters: dict,
+    top_index: TopIndex,
+    mask: Optional[np.ndarray],
+    segment_masks: dict,
+    key: tuple,
+):
+    st.subheader("Key Performance Indicators (KPIs)")
+
+    render_section("KPIs", display_kpis, cube=cube, filters=filters, key=key)
+
+    st.divider()
+
+    render_section(
+        "Top Customers",
+        display_data_table,
+        data=cleaned_data,
+        top_index=top_index,
+        mask=mask,
+        segment_masks=segment_masks,
+        key=key,
+    )
 
 
 if __name__ == "__main__":
@@ -1,12 +1,25 @@
+import hashlib
 import streamlit as st
 import numpy as np
 import pandas as pd
-import pickle
-import requests
-from typing import List, Tuple
-import os
+import time
+from typing import List, Optional, Tuple
 from datetime import datetime
 from utils import login
+from history_store import get_writer
+from model_store import OFFLINE_PATH, ArtifactError, load_model_components
+from inference import (
+    MODEL_KEYS,
+    InferencePlan,
+    compile_plan,
+    get_classifier,
+    predict_row,
+    prediction_cache,
+    prediction_key,
+    read_upload,
+    score_batch,
+    transform_features,
+)
 
 
 # function to set up page configuration
@@ -128,27 +141,57 @@ def display_sidebar_form() -> dict:
 
 
 @st.cache_resource(show_spinner="Please wait! Loading Model Components...")
-def get_model_components():
-    xgb_url = "https://github.com/modelMaestroSolo/Customer_churn_classification/raw/main/export/ml.pkl"
-
-    # Download the serialized model
-    response = requests.get(xgb_url)
-
-    # Check if the request was successful
-    if response.status_code == 200:
-        # Load the serialized model
-        serialized_model = response.content
-
-        # Deserialize the model using pickle
-        loaded_components = pickle.loads(serialized_model)
-
-        # Print a message to confirm successful loading
-        st.spinner("Serialized model with components loaded successfully!")
-    else:
-        # Handle the case when the request fails
-        st.error("Failed to download the serialized model.")
+def get_model_components(refresh: bool = False):
+    # serve the model from the local artifact store, downloading only when needed
+    try:
+        loaded_components, load_report = load_model_components(refresh=refresh)
+    except ArtifactError as error:
+        st.error(str(error))
+        st.stop()
+
+    # results computed with any other artifact are no longer valid
+    prediction_cache.invalidate(keep_sha256=load_report["sha256"])
+
+    return loaded_components, load_report
+
+
+@st.cache_resource(show_spinner="Compiling Inference Plan...")
+def get_inference_plan(_loaded_components: dict, sha256: str) -> Optional[InferencePlan]:
+    # compiled once per artifact hash; None keeps the pandas path
+    return compile_plan(_loaded_components)
+
+
+# time the (possibly cached) load so cold and warm starts can be compared
+def load_components() -> Tuple[dict, dict]:
+    start = time.perf_counter()
+    loaded_components, load_report = get_model_components()
+    st.session_state["model_warm_load_seconds"] = time.perf_counter() - start
+    return loaded_components, load_report
+
+
+def display_model_status():
+    with st.sidebar.expander("Model Artifact"):
+        if "model_warm_load_seconds" in st.session_state:
+            _, load_report = get_model_components()
+            st.write("Source:", load_report["source"])
+            st.write("SHA-256:", load_report["sha256"][:12])
+            st.write(f"Cold load: {load_report['cold_load_seconds']:.3f} s")
+            st.write(
+                f"Warm load: {st.session_state['model_warm_load_seconds'] * 1000:.3f} ms"
+            )
+
+        cache_stats = prediction_cache.stats()
+        st.write(
+            f"Prediction cache: {cache_stats['size']} entries, "
+            f"{cache_stats['hit_rate']:.0%} hit rate "
+            f"({cache_stats['hits']} hits / {cache_stats['misses']} misses)"
+        )
 
-    return loaded_components
+        if st.button("Refresh Model", disabled=bool(OFFLINE_PATH)):
+            get_model_components.clear()
+            get_model_components(refresh=True)
+            get_model_components.clear()  # next load is served from the new copy
+            st.rerun()
 
 
 def display_options_summary(inputs: dict):
@@ -183,14 +226,14 @@ def display_options_summary(inputs: dict):
         st.write("streaming Movies:", inputs["StreamingMovies"])
 
 
-def make_prediction(loaded_components: List[str], inputs: dict) -> Tuple[str]:
+def make_prediction(
+    loaded_components: List[str],
+    inputs: dict,
+    plan: Optional[InferencePlan] = None,
+    sha256: Optional[str] = None,
+) -> Tuple[str]:
 
     reference_features = loaded_components["reference_features"]
-    cat_preprocessor = loaded_components["cat_preprocessor"]
-    transformed_columns = loaded_components["transformed_columns"]
-    num_cols = loaded_components["numerical_columns"]
-    num_transformer = loaded_components["num_transformer"]
-    selected_features = loaded_components["selected_features"]
 
     input_data = np.array(
         [
@@ -215,24 +258,26 @@ def make_prediction(loaded_components: List[str], inputs: dict) -> Tuple[str]:
     ).reshape(1, -1)
     input_df = pd.DataFrame(data=input_data, columns=reference_features)
 
-    # data preprocessing
-    input_df_prepared = pd.DataFrame(
-        cat_preprocessor.transform(input_df), columns=transformed_columns
-    )
-
-    input_df_prepared[num_cols] = num_transformer.transform(input_df_prepared[num_cols])
-
-    input_df_prepared = input_df_prepared[selected_features]
-
     selected_model = inputs["selected_model"]
 
-    # make prediction using selected model
-    if selected_model == "Random Forest":
-        classifier = loaded_components["random_forest_classifier"]
-        prediction = classifier.predict(input_df_prepared)
-        predict_proba = classifier.predict_proba(input_df_prepared)
-    else:
-        classifier = loaded_components["gradient_boosting_classifier"]
+    # repeated profiles are answered from the shared prediction cache
+    key = prediction_key(inputs, reference_features, sha256) if sha256 else None
+    cached = prediction_cache.get(key) if key else None
+    if cached is not None:
+        prediction, predict_proba = cached
+        return input_df, selected_model, prediction, predict_proba
+
+    # make prediction using selected model, via the compiled plan when possible
+    prediction = None
+    if plan is not None:
+        try:
+            prediction, predict_proba = predict_row(loaded_components, plan, inputs)
+        except KeyError:
+            pass  # value outside the compiled categories
+
+    if prediction is None:
+        input_df_prepared = transform_features(loaded_components, input_df)
+        classifier = get_classifier(loaded_components, selected_model)
         prediction = classifier.predict(input_df_prepared)
         predict_proba = classifier.predict_proba(input_df_prepared)
 
@@ -245,6 +290,8 @@ def make_prediction(loaded_components: List[str], inputs: dict) -> Tuple[str]:
     predict_proba = predict_proba["Percentage Probabilities"].astype(str) + "%"
 
     prediction = prediction[0]
+    if key:
+        prediction_cache.put(key, (prediction, predict_proba))
     return input_df, selected_model, prediction, predict_proba
 
 
@@ -268,7 +315,7 @@ def display_prediction(prediction: str, predict_proba: float):
                 st.table(predict_proba)
 
 
-# function to store prediction history in a csv file
+# function to store prediction history in the history database
 def store_history(input_df: pd.DataFrame, selected_model: str, prediction: str):
     now = datetime.now()
     day_of_prediction = now.strftime("%Y-%m-%d %H:%M")
@@ -277,46 +324,125 @@ def store_history(input_df: pd.DataFrame, selected_model: str, prediction: str):
     input_df["ModelUsed"] = selected_model
     input_df["Prediction"] = prediction
 
-    input_df.to_csv(
-        "./data/history.csv",
-        mode="a",  # append history
-        header=not os.path.exists("./data/history.csv"),  # create header once
-        index=False,
+    get_writer().submit(input_df)  # written in the background
+
+
+# the scored file is kept per session and only rebuilt when the upload's
+# content, the model or the artifact changes, so other widgets rerun cheaply
+def score_upload(uploaded_file, selected_model: str) -> dict:
+    loaded_components, load_report = load_components()
+    key = (
+        hashlib.sha256(uploaded_file.getvalue()).hexdigest(),
+        selected_model,
+        load_report["sha256"],
+    )
+    result = st.session_state.get("batch_result")
+    if result is None or result["key"] != key:
+        plan = get_inference_plan(loaded_components, load_report["sha256"])
+        data = read_upload(uploaded_file)
+        with st.spinner(f"Scoring {len(data):,} customers..."):
+            scored, throughput = score_batch(
+                loaded_components, data, selected_model, plan=plan
+            )
+        result = {
+            "key": key,
+            "scored": scored,
+            "throughput": throughput,
+            "csv": scored.to_csv(index=False).encode("utf-8"),
+        }
+        st.session_state["batch_result"] = result
+    return result
+
+
+# function to score an uploaded file of customers in one go
+def display_batch_scoring():
+    st.markdown("#### Batch Scoring")
+    st.write(
+        "Upload a CSV or Parquet file of customers to score them all with the selected model."
+    )
+
+    selected_model = st.radio(
+        label="🚀 Choose A Model",
+        options=list(MODEL_KEYS),
+        horizontal=True,
+        key="batch_model",
+    )
+    uploaded_file = st.file_uploader(
+        "Customer file", type=["csv", "parquet"], key="batch_file"
+    )
+
+    if uploaded_file is None:
+        st.info("Upload a file with the same customer features as the prediction form.")
+        return
+
+    try:
+        result = score_upload(uploaded_file, selected_model)
+    except ValueError as error:
+        st.error(str(error))
+        return
+    scored, throughput = result["scored"], result["throughput"]
+
+    rows, churners, speed = st.columns(3)
+    rows.metric("Customers Scored", f"{len(scored):,}")
+    churners.metric("Predicted Churners", f"{(scored['Prediction'] == 'Yes').sum():,}")
+    speed.metric("Throughput", f"{throughput:,.0f} rows/s")
+
+    unknown = (scored["UnknownValues"] != "").sum()
+    if unknown:
+        st.warning(
+            f"{unknown:,} customers have values the model has not seen. They were "
+            "scored as unknown categories and are listed in the UnknownValues column."
+        )
+
+    st.dataframe(scored.head(100))
+    st.download_button(
+        label="Download Scored File",
+        data=result["csv"],
+        file_name="scored_customers.csv",
+        mime="text/csv",
     )
 
 
 def main():
-    
 
     display_title_container()
 
     inputs = display_sidebar_form()
     submitted = inputs["submitted"]
 
-    if submitted:
-        loaded_components = get_model_components()
-        input_df, selected_model, prediction, predict_proba = make_prediction(
-            loaded_components, inputs
-        )
+    single, batch = st.tabs(["Single Prediction", "Batch Scoring"])
 
-        display_prediction(prediction=prediction, predict_proba=predict_proba)
+    with single:
+        if submitted:
+            loaded_components, load_report = load_components()
+            plan = get_inference_plan(loaded_components, load_report["sha256"])
+            input_df, selected_model, prediction, predict_proba = make_prediction(
+                loaded_components, inputs, plan, sha256=load_report["sha256"]
+            )
 
-        display_options_summary(inputs=inputs)
+            display_prediction(prediction=prediction, predict_proba=predict_proba)
 
-        store_history(
-            input_df=input_df, selected_model=selected_model, prediction=prediction
-        )
-    else:
-        st.info(
-            """ 
-            ### Hello there👋! 
-            
-                To make a prediction:
-                    1. head over to the sidebar 
-                    2. choose preferred ML model and supply values for the customer features.
-                    3. Hit Predict when done! 
-            """
-        )
+            display_options_summary(inputs=inputs)
+
+            store_history(
+                input_df=input_df, selected_model=selected_model, prediction=prediction
+            )
+        else:
+            st.info(
+                """ 
+                ### Hello there👋! 
+                
+                    To make a prediction:
+                        1. head over to the sidebar 
+                        2. choose preferred ML model and supply values for the customer features.
+                        3. Hit Predict when done! 
+                """
+            )
+
+    with batch:
+        display_batch_scoring()
+
+    display_model_status()
 
 
 if __name__ == "__main__":
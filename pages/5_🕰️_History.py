@@ -1,9 +1,15 @@
 import streamlit as st
-import numpy as np
-import pandas as pd
-from typing import List, Tuple
-import os
+import math
+from datetime import date, datetime
+from typing import List, Optional, Tuple
 from utils import login
+from history_store import (
+    count_history,
+    distinct_values,
+    get_writer,
+    history_bounds,
+    query_history,
+)
 
 
 # function to set up page configuration
@@ -26,17 +32,90 @@ def display_title_container():
     )
 
 
-def display_history():
+# bounds that do not parse as dates fall back to today
+def parse_day(value: Optional[str]) -> date:
     try:
-        data = pd.read_csv("./data/history.csv")
-        st.dataframe(data)
-    except FileNotFoundError:
+        return datetime.strptime(value[:10], "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return date.today()
+
+
+# define function for filter widgets, values are pushed down to the database
+def display_sidebar() -> dict:
+    st.sidebar.header("Filter History")
+
+    first_day, last_day = (parse_day(day) for day in history_bounds())
+    first_day = min(first_day, last_day)
+    date_range = st.sidebar.date_input(
+        "Date Range",
+        value=(first_day, last_day),
+        min_value=first_day,
+        max_value=last_day,
+    )
+    start_date, end_date = (
+        date_range if len(date_range) == 2 else (date_range[0], date_range[0])
+    )
+
+    models = st.sidebar.multiselect(
+        "Model Used", options=distinct_values("ModelUsed"), default=[]
+    )
+    predictions = st.sidebar.multiselect(
+        "Prediction",
+        options=["Yes", "No"],
+        default=[],
+        format_func=lambda x: "Churn" if x == "Yes" else "No Churn",
+    )
+
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "models": models,
+        "predictions": predictions,
+    }
+
+
+def display_writer_metrics():
+    metrics = get_writer().metrics()
+    with st.sidebar.expander("History Writer"):
+        st.write("Queue depth:", metrics["queue_depth"])
+        st.write("Rows written:", metrics["rows_written"])
+        st.write(f"Last write: {metrics['last_write_ms']:.1f} ms")
+        st.write(f"Avg write: {metrics['avg_write_ms']:.1f} ms")
+        if metrics["rows_dropped"]:
+            st.write("Rows dropped:", metrics["rows_dropped"])
+
+
+def display_history():
+    if count_history() == 0:
         st.info("No predictions have been made yet!")
+        return
+
+    filters = display_sidebar()
+    total = count_history(**filters)
+    if total == 0:
+        st.info("No predictions match the selected filters.")
+        return
+
+    size_col, page_col = st.columns(2)
+    with size_col:
+        page_size = st.selectbox("Rows per page", options=[25, 50, 100, 250], index=1)
+    pages = math.ceil(total / page_size)
+    with page_col:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=1, step=1)
+
+    offset = (page - 1) * page_size
+    data = query_history(limit=page_size, offset=offset, **filters)
+    st.dataframe(data, hide_index=True)
+    st.caption(
+        f"Showing {offset + 1:,}-{offset + len(data):,} of {total:,} predictions "
+        f"(page {page} of {pages}, newest first)"
+    )
 
 
 def main():
     display_title_container()
     display_history()
+    display_writer_metrics()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+import glob
+import os
+import shutil
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from analytics import DIMENSIONS
+from data_store import CACHE_DIR
+
+
+DATASET_DIR = os.path.join(CACHE_DIR, "dataset")
+
+# filters on the partition columns skip whole files; rows are clustered by the
+# sort columns within each file so row-group statistics can skip the rest
+PARTITION_COLUMNS = ["Contract", "InternetService"]
+SORT_COLUMNS = ["Churn", "PaymentMethod"]
+ROW_GROUP_SIZE = 64_000
+
+
+class ArrowBackend:
+    """Dashboard queries over a hive-partitioned Parquet copy of the dataset.
+
+    Sidebar selections become pyarrow predicates and only the requested
+    columns are read, so a query touches just the files and row groups
+    that can hold matching customers.
+    """
+
+    def __init__(self, path: str):
+        import pyarrow.dataset as ds
+
+        self.path = path
+        self.dataset = ds.dataset(path, format="parquet", partitioning="hive")
+
+    @classmethod
+    def build(
+        cls, data: pd.DataFrame, version: str, root: str = DATASET_DIR
+    ) -> "ArrowBackend":
+        """Open the partitioned copy for ``version``, writing it on first use."""
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        path = os.path.join(root, version)
+        if not os.path.isdir(path):
+            table = pa.Table.from_pandas(
+                data.astype({col: str for col in DIMENSIONS}).sort_values(
+                    PARTITION_COLUMNS + SORT_COLUMNS
+                ),
+                preserve_index=False,
+            )
+            tmp_path = f"{path}.tmp"
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            ds.write_dataset(
+                table,
+                tmp_path,
+                format="parquet",
+                partitioning=PARTITION_COLUMNS,
+                partitioning_flavor="hive",
+                min_rows_per_group=ROW_GROUP_SIZE,
+                max_rows_per_group=ROW_GROUP_SIZE,
+            )
+            os.replace(tmp_path, path)
+
+        for stale in glob.glob(os.path.join(root, "*")):
+            if stale != path:
+                shutil.rmtree(stale, ignore_errors=True)
+
+        return cls(path)
+
+    @staticmethod
+    def predicate(filters: Optional[Dict[str, List[str]]] = None):
+        """Filter expression for ``filters``; empty selections do not filter."""
+        import pyarrow.compute as pc
+
+        expression = None
+        for dimension, values in (filters or {}).items():
+            if values:
+                condition = pc.field(dimension).isin(values)
+                expression = (
+                    condition if expression is None else expression & condition
+                )
+        return expression
+
+    def read(
+        self, columns: List[str], filters: Optional[Dict[str, List[str]]] = None
+    ) -> pd.DataFrame:
+        table = self.dataset.to_table(columns=columns, filter=self.predicate(filters))
+        data = table.to_pandas()
+        for col in DIMENSIONS:
+            if col in data.columns:
+                data[col] = data[col].astype("category")
+        return data
+
+    def scan_bytes(
+        self, columns: List[str], filters: Optional[Dict[str, List[str]]] = None
+    ) -> Tuple[int, int]:
+        """Compressed bytes a query reads, next to the size of the whole dataset."""
+
+        def size(fragment, selected: Optional[List[str]] = None) -> int:
+            metadata = fragment.metadata
+            return sum(
+                chunk.total_compressed_size
+                for row_group in fragment.row_groups
+                for chunk in (
+                    metadata.row_group(row_group.id).column(i)
+                    for i in range(metadata.num_columns)
+                )
+                if selected is None or chunk.path_in_schema in selected
+            )
+
+        expression = self.predicate(filters)
+        total = sum(size(fragment) for fragment in self.dataset.get_fragments())
+        scanned = 0
+        for fragment in self.dataset.get_fragments(filter=expression):
+            if expression is not None:
+                # drop the row groups whose statistics rule out a match
+                fragment = fragment.subset(
+                    filter=expression, schema=self.dataset.schema
+                )
+            scanned += size(fragment, columns)
+        return scanned, total
@@ -0,0 +1,64 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+
+class ResultCache:
+    """Bounded, thread-safe LRU of computed results with hit-rate counters.
+
+    Meant to live in ``st.cache_resource`` or at module level so that every
+    session shares it; callers build keys that pin down everything the
+    result depends on.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple):
+        with self._lock:
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_build(self, key: tuple, build: Callable[[], object]):
+        """Return the cached result for ``key``, building and storing it on a miss."""
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, keep: Optional[Callable[[tuple], bool]] = None):
+        """Drop every entry, or only those whose key ``keep`` rejects."""
+        with self._lock:
+            if keep is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if not keep(k)]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
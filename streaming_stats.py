@@ -0,0 +1,260 @@
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class RunningStats:
+    """Count, mean, variance, min and max over chunks, mergeable.
+
+    Each chunk is reduced with numpy and combined with the running state by
+    the parallel form of Welford's update, so the result matches a single
+    pass over all values without holding them.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, values: Iterable[float]):
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        chunk = RunningStats()
+        chunk.count = len(values)
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(((values - chunk.mean) ** 2).sum())
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        self.merge(chunk)
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        if not other.count:
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta**2 * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else float("nan")
+
+    def std(self) -> float:
+        return float(np.sqrt(self.variance()))
+
+
+class TopK:
+    """Value frequencies of a categorical column over chunks, mergeable.
+
+    Counts are exact; the churn enumerations have a handful of values each.
+    """
+
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, values: Iterable):
+        for value, n in pd.Series(values).value_counts().items():
+            self.counts[value] = self.counts.get(value, 0) + int(n)
+
+    def merge(self, other: "TopK") -> "TopK":
+        for value, n in other.counts.items():
+            self.counts[value] = self.counts.get(value, 0) + n
+        return self
+
+    def top(self, k: int = 1) -> List[Tuple[object, int]]:
+        return sorted(self.counts.items(), key=lambda item: -item[1])[:k]
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts.values())
+
+
+class QuantileSketch:
+    """Mergeable fixed-width histogram for approximate quantiles.
+
+    Values are counted and summed in bins of ``bin_width``. Quantiles use
+    pandas' linear interpolation between order statistics, each taken as the
+    mean of the bin it falls in, so they are within one bin width of
+    ``Series.quantile`` and exact when every bin holds a single distinct
+    value (e.g. integers with the default width). Sketches built on separate
+    chunks can be added together, and counts can be removed when a value is
+    replaced.
+    """
+
+    def __init__(self, bin_width: float = 0.5):
+        self.bin_width = bin_width
+        self.counts = {}
+        self.sums = {}
+        self.count = 0
+        self.total = 0.0
+
+    def _bins(self, values: Iterable[float]) -> Tuple[np.ndarray, np.ndarray]:
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        return values, np.floor(values / self.bin_width).astype("int64")
+
+    def _update(self, values: Iterable[float], sign: int):
+        values, bins = self._bins(values)
+        bin_ids, inverse, counts = np.unique(
+            bins, return_inverse=True, return_counts=True
+        )
+        sums = np.bincount(inverse, weights=values, minlength=len(bin_ids))
+        for bin_id, n, total in zip(bin_ids.tolist(), counts.tolist(), sums.tolist()):
+            remaining = self.counts.get(bin_id, 0) + sign * n
+            if remaining > 0:
+                self.counts[bin_id] = remaining
+                self.sums[bin_id] = self.sums.get(bin_id, 0.0) + sign * total
+            else:
+                self.counts.pop(bin_id, None)
+                self.sums.pop(bin_id, None)
+        self.count += sign * len(values)
+        self.total += sign * float(values.sum())
+
+    def add(self, values: Iterable[float]):
+        self._update(values, 1)
+
+    def remove(self, values: Iterable[float]):
+        self._update(values, -1)
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        if other.bin_width != self.bin_width:
+            raise ValueError("Cannot merge sketches with different bin widths")
+        for bin_id, n in other.counts.items():
+            self.counts[bin_id] = self.counts.get(bin_id, 0) + n
+            self.sums[bin_id] = self.sums.get(bin_id, 0.0) + other.sums[bin_id]
+        self.count += other.count
+        self.total += other.total
+        return self
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float("nan")
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return float("nan")
+        bins = sorted(self.counts)
+        counts = np.array([self.counts[b] for b in bins])
+        means = np.array([self.sums[b] for b in bins]) / counts
+        cumulative = np.cumsum(counts)
+
+        def order_statistic(k: int) -> float:
+            return float(means[np.searchsorted(cumulative, k, side="right")])
+
+        position = q * (self.count - 1)
+        lower = int(np.floor(position))
+        upper = min(lower + 1, self.count - 1)
+        low, high = order_statistic(lower), order_statistic(upper)
+        return low + (high - low) * (position - lower)
+
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def to_dict(self) -> dict:
+        return {
+            "bin_width": self.bin_width,
+            "count": self.count,
+            "total": self.total,
+            "counts": {str(b): n for b, n in self.counts.items()},
+            "sums": {str(b): total for b, total in self.sums.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "QuantileSketch":
+        sketch = cls(bin_width=state["bin_width"])
+        sketch.count = state["count"]
+        sketch.total = state["total"]
+        sketch.counts = {int(b): n for b, n in state["counts"].items()}
+        # states saved before per-bin sums place each bin's values at its centre
+        sums = state.get("sums") or {
+            b: (int(b) + 0.5) * sketch.bin_width * n for b, n in state["counts"].items()
+        }
+        sketch.sums = {int(b): total for b, total in sums.items()}
+        return sketch
+
+
+class Summary:
+    """Streaming equivalent of ``DataFrame.describe()`` for chosen columns.
+
+    Numeric columns keep running moments and a quantile sketch, categorical
+    columns keep value counts. Summaries of separate chunks or partitions
+    merge into the summary of their union, so the data never has to be
+    held in memory at once. Quantiles are within one sketch bin of
+    ``describe()`` and clipped to the observed range.
+    """
+
+    def __init__(
+        self,
+        numeric: List[str],
+        categorical: Optional[List[str]] = None,
+        bin_width: float = 0.5,
+    ):
+        self.moments = {col: RunningStats() for col in numeric}
+        self.sketches = {col: QuantileSketch(bin_width) for col in numeric}
+        self.frequencies = {col: TopK() for col in categorical or []}
+
+    @classmethod
+    def from_chunks(
+        cls, chunks: Iterable[pd.DataFrame], numeric: List[str], **options
+    ) -> "Summary":
+        summary = cls(numeric, **options)
+        for chunk in chunks:
+            summary.add(chunk)
+        return summary
+
+    def add(self, chunk: pd.DataFrame):
+        for col in self.moments:
+            values = chunk[col].to_numpy(dtype="float64")
+            values = values[~np.isnan(values)]
+            self.moments[col].add(values)
+            self.sketches[col].add(values)
+        for col, frequencies in self.frequencies.items():
+            frequencies.add(chunk[col])
+
+    def merge(self, other: "Summary") -> "Summary":
+        for col in self.moments:
+            self.moments[col].merge(other.moments[col])
+            self.sketches[col].merge(other.sketches[col])
+        for col, frequencies in self.frequencies.items():
+            frequencies.merge(other.frequencies[col])
+        return self
+
+    def describe_numeric(self) -> pd.DataFrame:
+        summary = {}
+        for col, moments in self.moments.items():
+            sketch = self.sketches[col]
+
+            def quantile(q: float) -> float:
+                return float(np.clip(sketch.quantile(q), moments.min, moments.max))
+
+            empty = not moments.count
+            summary[col] = {
+                "count": float(moments.count),
+                "mean": float("nan") if empty else moments.mean,
+                "std": moments.std(),
+                "min": float("nan") if empty else moments.min,
+                "25%": quantile(0.25),
+                "50%": quantile(0.5),
+                "75%": quantile(0.75),
+                "max": float("nan") if empty else moments.max,
+            }
+        return pd.DataFrame(summary)
+
+    def describe_categorical(self) -> pd.DataFrame:
+        summary = {}
+        for col, frequencies in self.frequencies.items():
+            top = frequencies.top(1)
+            summary[col] = {
+                "count": frequencies.count,
+                "unique": len(frequencies.counts),
+                "top": top[0][0] if top else None,
+                "freq": top[0][1] if top else 0,
+            }
+        return pd.DataFrame(summary, dtype=object)
@@ -1,14 +1,34 @@
+import os
+import time
 import streamlit as st
 import streamlit_authenticator as stauth
 import yaml
 from yaml.loader import SafeLoader
 from typing import Callable
 
+CONFIG_PATH = "./config.yaml"
 
-def login(main: callable):
-    with open("./config.yaml") as file:
+
+# parsed once per process and re-read only when the file changes. Plain-text
+# passwords are hashed here, otherwise stauth.Authenticate would bcrypt them
+# again on every rerun
+@st.cache_data(show_spinner=False, max_entries=1)
+def _load_config(path: str, mtime_ns: int) -> dict:
+    with open(path) as file:
         config = yaml.load(file, Loader=SafeLoader)
 
+    for user in config["credentials"]["usernames"].values():
+        if not stauth.Hasher._is_hash(user["password"]):
+            user["password"] = stauth.Hasher([user["password"]]).generate()[0]
+    return config
+
+
+def load_config(path: str = CONFIG_PATH) -> dict:
+    return _load_config(path, os.stat(path).st_mtime_ns)
+
+
+def _authenticate():
+    config = load_config()
     authenticator = stauth.Authenticate(
         config["credentials"],
         config["cookie"]["name"],
@@ -17,8 +37,20 @@ def login(main: callable):
         config["preauthorized"],
     )
     authenticator.login(location="main")
+
+
+def login(main: Callable):
+    start = time.perf_counter()
+    # an authenticated session skips the config, cookie and password checks
+    if not st.session_state.get("authentication_status"):
+        _authenticate()
+    st.session_state["auth_seconds"] = time.perf_counter() - start
+
     if st.session_state["authentication_status"]:
         st.sidebar.header(f'Welcome *{st.session_state["name"]}*!')
+        st.sidebar.caption(
+            f"Login check: {st.session_state['auth_seconds'] * 1000:.1f} ms"
+        )
         main()
 
     elif st.session_state["authentication_status"] is False: